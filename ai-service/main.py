@@ -5,6 +5,7 @@ import os
 from contextlib import asynccontextmanager
 from model import ModelManager
 from cache import CacheManager
+from metrics import install_metrics
 
 # Initialize Managers
 model_manager = ModelManager()
@@ -23,6 +24,7 @@ async def lifespan(app: FastAPI):
     print("Shutting down AI Service...")
 
 app = FastAPI(title="AI Service", version="1.0.0", lifespan=lifespan)
+install_metrics(app, "ai-service")
 
 class QuestionRequest(BaseModel):
     question: str
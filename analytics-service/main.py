@@ -5,8 +5,10 @@ import redis
 import json
 import os
 from datetime import datetime
+from metrics import install_metrics
 
 app = FastAPI(title="Analytics Service", version="1.0.0")
+install_metrics(app, "analytics")
 
 
 # In-memory fallback if Redis is not available
@@ -0,0 +1,76 @@
+"""Per-route request metrics exposed in Prometheus format at /metrics.
+
+This module is shared verbatim by the backend, ai-service and
+analytics-service. Each service is built from its own directory, so it is
+copied, and CI fails if the copies differ. Service-specific measurements
+plug in as hooks with start(request) -> token and finish(request, route,
+token) methods, and scrape-time collectors are passed as `collectors`.
+
+When PROMETHEUS_MULTIPROC_DIR is set (run_all.py --production starts several
+workers per service) /metrics aggregates the samples of every worker.
+"""
+import os
+import time
+from fastapi import FastAPI, Request, Response
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Gauge, Histogram, generate_latest
+from prometheus_client import multiprocess
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["service", "method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "Requests currently being handled",
+    ["service"],
+    multiprocess_mode="livesum",
+)
+
+
+def route_template(request: Request) -> str:
+    """The matched path template (e.g. /api/portfolio/public/{share_token}) to keep label cardinality bounded"""
+    route = request.scope.get("route")
+    return getattr(route, "path", "unmatched")
+
+
+def metrics_registry(collectors=()):
+    if not os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = REGISTRY
+    else:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    for collector in collectors:
+        registry.register(collector)
+    return registry
+
+
+def install_metrics(app: FastAPI, service: str, hooks=(), collectors=()):
+    """Record latency for every request and serve /metrics"""
+    registry = metrics_registry(collectors)
+
+    @app.middleware("http")
+    async def record_request_metrics(request: Request, call_next):
+        if request.url.path == "/metrics":
+            return await call_next(request)
+        tokens = [hook.start(request) for hook in hooks]
+        in_progress = REQUESTS_IN_PROGRESS.labels(service)
+        in_progress.inc()
+        started = time.perf_counter()
+        status = 500
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        finally:
+            elapsed = time.perf_counter() - started
+            in_progress.dec()
+            route = route_template(request)
+            REQUEST_LATENCY.labels(service, request.method, route, str(status)).observe(elapsed)
+            for hook, token in zip(hooks, tokens):
+                hook.finish(request, route, token)
+
+    @app.get("/metrics", include_in_schema=False)
+    def metrics():
+        return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
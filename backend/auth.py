@@ -4,17 +4,37 @@ from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from database import get_db
-from models import User
+from database import get_db, get_async_db, DB_ASYNC, sticky_key
+from models import User, Student, Faculty
+from schemas import Principal
+from cache import CacheManager
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import asyncio
+import multiprocessing
 import os
+import threading
+import time
 
 SECRET_KEY = os.getenv("SECRET_KEY", "09d25e094faa6ca2556c818166b7a9563b93f7099f6f0f4caa6cf63b88e8d3e7")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+PRINCIPAL_CACHE_TTL = int(os.getenv("PRINCIPAL_CACHE_TTL", "300"))
+# Max concurrent pbkdf2 computations for login/registration; hashlib releases
+# the GIL while hashing so a thread pool is enough to keep them off the loop
+PASSWORD_HASH_CONCURRENCY = int(os.getenv("PASSWORD_HASH_CONCURRENCY", os.cpu_count() or 1))
+LOGIN_WINDOW_SECONDS = int(os.getenv("LOGIN_WINDOW_SECONDS", "60"))
+# Only failed logins are counted. The per-IP limit is shared by everyone
+# behind one address (a campus NAT or proxy egress), so it is sized for a
+# crowd mistyping passwords at once; the per-email limit stops guessing
+LOGIN_MAX_ATTEMPTS_PER_IP = int(os.getenv("LOGIN_MAX_ATTEMPTS_PER_IP", "200"))
+LOGIN_MAX_ATTEMPTS_PER_EMAIL = int(os.getenv("LOGIN_MAX_ATTEMPTS_PER_EMAIL", "10"))
 
 pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
+principal_cache = CacheManager("principal", maxsize=int(os.getenv("PRINCIPAL_CACHE_SIZE", "4096")))
 
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
@@ -22,6 +42,164 @@ def verify_password(plain_password, hashed_password):
 def get_password_hash(password):
     return pwd_context.hash(password)
 
+class HashMetrics:
+    """Counters describing the cost of password hashing work"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.in_flight = 0
+        self.count = {"hash": 0, "verify": 0}
+        self.seconds = {"hash": 0.0, "verify": 0.0}
+        self.max_seconds = {"hash": 0.0, "verify": 0.0}
+        self.wait_seconds = 0.0
+
+    def run(self, op, fn, *args, submitted_at=None):
+        started = time.perf_counter()
+        with self._lock:
+            self.queued -= 1
+            self.in_flight += 1
+            if submitted_at is not None:
+                self.wait_seconds += started - submitted_at
+        try:
+            return fn(*args)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.in_flight -= 1
+                self.count[op] += 1
+                self.seconds[op] += elapsed
+                self.max_seconds[op] = max(self.max_seconds[op], elapsed)
+
+    def submitted(self):
+        with self._lock:
+            self.queued += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            total = sum(self.count.values())
+            return {
+                "concurrency_limit": PASSWORD_HASH_CONCURRENCY,
+                "queued": self.queued,
+                "in_flight": self.in_flight,
+                "operations": dict(self.count),
+                "seconds_total": {op: round(v, 6) for op, v in self.seconds.items()},
+                "seconds_max": {op: round(v, 6) for op, v in self.max_seconds.items()},
+                "avg_queue_wait_seconds": round(self.wait_seconds / total, 6) if total else 0.0,
+            }
+
+hash_metrics = HashMetrics()
+_password_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_CONCURRENCY, thread_name_prefix="password-hash")
+
+def _submit(op, fn, *args):
+    hash_metrics.submitted()
+    return _password_executor.submit(hash_metrics.run, op, fn, *args, submitted_at=time.perf_counter())
+
+async def verify_password_async(plain_password, hashed_password) -> bool:
+    """verify_password on the bounded hashing executor, awaited from the event loop"""
+    return await asyncio.wrap_future(_submit("verify", verify_password, plain_password, hashed_password))
+
+def hash_password_bounded(password) -> str:
+    """get_password_hash for sync routes, sharing the executor's concurrency limit"""
+    return _submit("hash", get_password_hash, password).result()
+
+class LoginAttemptLimiter:
+    """Fixed-window failed-login counters per client IP and per account email.
+
+    Counts are shared through Redis when available so every worker sees the
+    same window; otherwise they are tracked in-process.
+    """
+
+    def __init__(self, window: int, max_per_ip: int, max_per_email: int):
+        self.window = window
+        self.limits = {"ip": max_per_ip, "email": max_per_email}
+        self.client = principal_cache.client
+        self._local = {}
+        self._lock = threading.Lock()
+
+    def _keys(self, ip: str, email: str) -> dict:
+        window_id = int(time.time() // self.window)
+        return {kind: f"login:{kind}:{value}:{window_id}" for kind, value in (("ip", ip), ("email", email.lower()))}
+
+    def _get(self, keys) -> list:
+        if self.client is not None:
+            try:
+                return [int(count or 0) for count in self.client.mget(keys)]
+            except Exception:
+                pass
+        now = time.monotonic()
+        with self._lock:
+            return [count if expires_at > now else 0 for count, expires_at in (self._local.get(key, (0, now)) for key in keys)]
+
+    def _incr(self, key: str) -> int:
+        if self.client is not None:
+            try:
+                pipe = self.client.pipeline()
+                pipe.incr(key)
+                pipe.expire(key, self.window, nx=True)
+                return pipe.execute()[0]
+            except Exception:
+                pass
+        now = time.monotonic()
+        with self._lock:
+            count, expires_at = self._local.get(key, (0, now + self.window))
+            if expires_at <= now:
+                count, expires_at = 0, now + self.window
+            self._local[key] = (count + 1, expires_at)
+            if len(self._local) > 100000:
+                self._local = {k: v for k, v in self._local.items() if v[1] > now}
+            return count + 1
+
+    def _delete(self, key: str):
+        if self.client is not None:
+            try:
+                self.client.delete(key)
+            except Exception:
+                pass
+        with self._lock:
+            self._local.pop(key, None)
+
+    def allowed(self, ip: str, email: str) -> bool:
+        """False when the IP or the email has used up its failures for this window"""
+        keys = self._keys(ip, email)
+        counts = self._get(list(keys.values()))
+        return all(count < self.limits[kind] for kind, count in zip(keys, counts))
+
+    def failed(self, ip: str, email: str):
+        """Count a failed verification against both the IP and the email"""
+        for key in self._keys(ip, email).values():
+            self._incr(key)
+
+    def succeeded(self, ip: str, email: str):
+        """A correct password clears the account's failures; the IP's stay"""
+        self._delete(self._keys(ip, email)["email"])
+
+    def retry_after(self) -> int:
+        return self.window - int(time.time()) % self.window
+
+login_limiter = LoginAttemptLimiter(LOGIN_WINDOW_SECONDS, LOGIN_MAX_ATTEMPTS_PER_IP, LOGIN_MAX_ATTEMPTS_PER_EMAIL)
+
+_hash_pool = None
+_hash_pool_lock = threading.Lock()
+
+def hash_passwords(passwords):
+    """Hash many passwords across a process pool (used by bulk imports)"""
+    global _hash_pool
+    passwords = list(passwords)
+    if len(passwords) < 8:
+        return [get_password_hash(p) for p in passwords]
+    with _hash_pool_lock:
+        if _hash_pool is None:
+            # Never fork: this runs in a threaded server process, and a forked
+            # child can inherit locks held by other threads and deadlock
+            start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            _hash_pool = ProcessPoolExecutor(
+                max_workers=int(os.getenv("HASH_POOL_WORKERS", os.cpu_count() or 1)),
+                mp_context=multiprocessing.get_context(start_method),
+            )
+    workers = _hash_pool._max_workers
+    return list(_hash_pool.map(get_password_hash, passwords, chunksize=max(1, len(passwords) // (workers * 4))))
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -32,7 +210,39 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+def _principal_query(email: str):
+    return (
+        select(User.id, User.email, User.role, Student.id, Faculty.id)
+        .outerjoin(Student, Student.user_id == User.id)
+        .outerjoin(Faculty, Faculty.user_id == User.id)
+        .where(User.email == email)
+        .limit(1)
+    )
+
+def _to_principal(row) -> Optional[Principal]:
+    if row is None:
+        return None
+    user_id, user_email, role, student_id, faculty_id = row
+    return Principal(id=user_id, email=user_email, role=role, student_id=student_id, faculty_id=faculty_id)
+
+def load_principal(db: Session, email: str) -> Optional[Principal]:
+    """Fetch the user together with its profile ids in a single query."""
+    return _to_principal(db.execute(_principal_query(email)).first())
+
+async def load_principal_async(db, email: str) -> Optional[Principal]:
+    """load_principal for AsyncSession (DB_ASYNC) or, failing that, via the threadpool"""
+    if DB_ASYNC:
+        return _to_principal((await db.execute(_principal_query(email))).first())
+    return await run_in_threadpool(load_principal, db, email)
+
+# Session dependency for async auth paths: AsyncSession when DB_ASYNC is on
+get_auth_db = get_async_db if DB_ASYNC else get_db
+
+def invalidate_principal(email: str):
+    """Drop a cached principal, e.g. after its role or profile changed."""
+    principal_cache.delete(email)
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db=Depends(get_auth_db)) -> Principal:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -45,8 +255,19 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
             raise credentials_exception
     except JWTError:
         raise credentials_exception
-    
-    user = db.query(User).filter(User.email == email).first()
-    if user is None:
+
+    sticky_key.set(email)
+    cached = principal_cache.get(email)
+    if cached is not None:
+        return Principal(**cached)
+
+    principal = await load_principal_async(db, email)
+    if principal is None:
         raise credentials_exception
-    return user
+
+    # Never keep a principal around longer than the token that produced it
+    ttl = PRINCIPAL_CACHE_TTL
+    if payload.get("exp"):
+        ttl = min(ttl, payload["exp"] - time.time())
+    principal_cache.set(email, principal.model_dump(mode="json"), ttl)
+    return principal
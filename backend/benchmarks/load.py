@@ -0,0 +1,222 @@
+"""Load driver for the core backend endpoints.
+
+Runs each scenario for a fixed number of requests at a fixed concurrency
+against a running backend (seeded with benchmarks/seed.py) and reports
+throughput plus p50/p99 latency per endpoint. Results are written as JSON
+baselines so regressions show up in a diff; --compare prints the change
+against an earlier run.
+
+Usage (from backend/):
+    python benchmarks/load.py --base-url http://localhost:8000 --requests 500 --concurrency 16 \\
+        --output benchmarks/baselines/sqlite-2k.json [--compare benchmarks/baselines/sqlite-2k.json]
+
+The login scenario uses the seeded passwords, and only failed logins count
+toward LOGIN_MAX_ATTEMPTS_PER_IP / LOGIN_MAX_ATTEMPTS_PER_EMAIL, so it runs
+under the default limits. (Real clients behind the gateway are limited per
+forwarded client address.)
+"""
+import argparse
+import http.client
+import json
+import os
+import platform
+import statistics
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from urllib.parse import urlencode, urlsplit
+
+PASSWORD = "benchpass"
+SCENARIOS = ["register", "login", "portfolio_me", "add_achievement", "verify_achievement",
+             "pending", "analytics", "public_portfolio"]
+
+
+class Client:
+    """One keep-alive HTTP connection per worker thread"""
+
+    _local = threading.local()
+
+    def __init__(self, base_url: str):
+        parts = urlsplit(base_url)
+        self.host, self.port = parts.hostname, parts.port or 80
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = http.client.HTTPConnection(self.host, self.port, timeout=60)
+        return conn
+
+    def request(self, method, path, json_body=None, form=None, token=None):
+        headers = {}
+        body = None
+        if json_body is not None:
+            body, headers["Content-Type"] = json.dumps(json_body), "application/json"
+        elif form is not None:
+            body, headers["Content-Type"] = urlencode(form), "application/x-www-form-urlencoded"
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        for attempt in (0, 1):
+            conn = self._conn()
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                response = conn.getresponse()
+                return response.status, response.read()
+            except (http.client.HTTPException, ConnectionError):
+                conn.close()
+                self._local.conn = None
+                if attempt:
+                    raise
+
+
+def login(client, email):
+    status, body = client.request("POST", "/api/auth/login", form={"username": email, "password": PASSWORD})
+    if status != 200:
+        raise SystemExit(f"Login failed for {email} ({status}): {body[:200]!r}. Was the database seeded?")
+    return json.loads(body)["access_token"]
+
+
+def pending_ids(client, token, count):
+    ids, cursor = [], None
+    while len(ids) < count:
+        path = "/api/portfolio/achievements/pending?limit=200" + (f"&cursor={cursor}" if cursor else "")
+        conn = client._conn()
+        conn.request("GET", path, headers={"Authorization": f"Bearer {token}"})
+        response = conn.getresponse()
+        page = json.loads(response.read())
+        ids += [a["id"] for a in page]
+        cursor = response.getheader("X-Next-Cursor")
+        if not cursor:
+            break
+    return ids[:count]
+
+
+def build_scenarios(client, args):
+    run_id = uuid.uuid4().hex[:8]
+    student_tokens = [login(client, f"bench-student-{i}@eduzo.example.com") for i in range(min(args.students, 32))]
+    faculty_token = login(client, "bench-faculty-0@eduzo.example.com")
+    verify_ids = pending_ids(client, faculty_token, args.requests)
+    public_count = max(1, int(args.students * args.public_ratio))
+
+    def student(i):
+        return student_tokens[i % len(student_tokens)]
+
+    return {
+        "register": lambda i: client.request("POST", "/api/auth/register", json_body={
+            "email": f"load-{run_id}-{i}@eduzo.example.com", "password": PASSWORD, "role": "student",
+            "full_name": f"Load {i}", "enrollment_no": f"LOAD-{run_id}-{i}"}),
+        "login": lambda i: client.request("POST", "/api/auth/login", form={
+            "username": f"bench-student-{i % args.students}@eduzo.example.com", "password": PASSWORD}),
+        "portfolio_me": lambda i: client.request("GET", "/api/portfolio/me", token=student(i)),
+        "add_achievement": lambda i: client.request("POST", "/api/portfolio/achievements", token=student(i), json_body={
+            "title": f"Load test achievement {i}", "description": "generated by benchmarks/load.py",
+            "category": "TECHNICAL"}),
+        "verify_achievement": lambda i: client.request(
+            "PUT", f"/api/portfolio/achievements/{verify_ids[i % len(verify_ids)]}/verify?status=VERIFIED",
+            token=faculty_token) if verify_ids else (0, b"no pending achievements"),
+        "pending": lambda i: client.request("GET", "/api/portfolio/achievements/pending?limit=50", token=faculty_token),
+        "analytics": lambda i: client.request("GET", "/api/portfolio/analytics", token=faculty_token),
+        "public_portfolio": lambda i: client.request("GET", f"/api/portfolio/public/bench-share-{i % public_count}"),
+    }
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def run_scenario(fn, requests, concurrency):
+    latencies, errors, statuses = [], 0, {}
+    lock = threading.Lock()
+
+    def one(i):
+        nonlocal errors
+        started = time.perf_counter()
+        try:
+            status, _ = fn(i)
+        except Exception:
+            status = 0
+        elapsed = time.perf_counter() - started
+        with lock:
+            latencies.append(elapsed)
+            statuses[status] = statuses.get(status, 0) + 1
+            if not 200 <= status < 300:
+                errors += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(requests)))
+    wall = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": requests,
+        "errors": errors,
+        "status_codes": {str(k): v for k, v in sorted(statuses.items())},
+        "throughput_rps": round(requests / wall, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 2),
+    }
+
+
+def compare(current, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)["endpoints"]
+    print(f"\n{'endpoint':<20}{'rps':>18}{'p50 ms':>20}{'p99 ms':>20}")
+    for name, result in current.items():
+        old = baseline.get(name)
+        if not old:
+            continue
+
+        def delta(key):
+            before, after = old[key], result[key]
+            change = (after - before) / before * 100 if before else 0.0
+            return f"{before:>7} -> {after:<7} {change:+5.0f}%"
+
+        print(f"{name:<20}{delta('throughput_rps'):>18}  {delta('p50_ms'):>20}  {delta('p99_ms'):>20}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backend load driver")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--requests", type=int, default=500, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--students", type=int, default=1000, help="as passed to seed.py")
+    parser.add_argument("--public-ratio", type=float, default=0.5, help="as passed to seed.py")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--output", help="write results as a JSON baseline")
+    parser.add_argument("--compare", help="baseline JSON to compare against")
+    args = parser.parse_args()
+
+    client = Client(args.base_url)
+    scenarios = build_scenarios(client, args)
+    results = {}
+    for name in args.scenarios.split(","):
+        results[name] = run_scenario(scenarios[name], args.requests, args.concurrency)
+        r = results[name]
+        print(f"{name:<20} {r['throughput_rps']:>8} req/s  p50 {r['p50_ms']:>8} ms  p99 {r['p99_ms']:>8} ms"
+              f"  errors {r['errors']} {r['status_codes']}")
+
+    if args.compare:
+        compare(results, args.compare)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        report = {
+            "meta": {
+                "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "base_url": args.base_url,
+                "requests": args.requests,
+                "concurrency": args.concurrency,
+                "students": args.students,
+                "python": platform.python_version(),
+                "cpus": os.cpu_count(),
+            },
+            "endpoints": results,
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"\nWrote {args.output}")
@@ -0,0 +1,116 @@
+"""Seed a database with synthetic students, faculty and achievements.
+
+Rows are bulk-inserted straight into DATABASE_URL (SQLite or Postgres), so
+seeding 100k achievements takes seconds. Everything is deterministic for a
+given --seed, and the naming scheme is what benchmarks/load.py expects:
+
+    bench-student-<i>@eduzo.example.com / bench-faculty-<i>@eduzo.example.com, password "benchpass"
+    share token bench-share-<i> for the first --public-ratio of the students
+
+Usage (from backend/):
+    DATABASE_URL=sqlite:///./bench.db python benchmarks/seed.py --students 1000 --achievements 20
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert  # noqa: E402
+from database import Base, SessionLocal, engine  # noqa: E402
+from models import (  # noqa: E402
+    Achievement, AchievementCategory, AchievementStatus, Faculty, Portfolio, Student, User, UserRole,
+)
+from auth import get_password_hash  # noqa: E402
+import search  # noqa: E402
+import stats  # noqa: E402
+
+PASSWORD = "benchpass"
+DEPARTMENTS = ["Computer Science", "Electrical", "Mechanical", "Civil", "Physics", "Mathematics"]
+PROGRAMS = ["B.Tech", "M.Tech", "B.Sc", "M.Sc"]
+WORDS = ("robotics hackathon football chess research quantum music debate volunteer coding "
+         "olympiad paper internship startup dance marathon drama leadership award seminar").split()
+BATCH = 5000
+
+
+def batched(rows, size=BATCH):
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+def seed(students: int, faculty: int, achievements_per_student: int, public_ratio: float, rng: random.Random):
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        search.create_search_index(connection)
+
+    hashed = get_password_hash(PASSWORD)
+    db = SessionLocal()
+    try:
+        # Let the database assign ids (keeps Postgres sequences in step) and
+        # map them back through RETURNING
+        users = [{"email": f"bench-student-{i}@eduzo.example.com", "hashed_password": hashed,
+                  "role": UserRole.STUDENT.value} for i in range(students)]
+        users += [{"email": f"bench-faculty-{i}@eduzo.example.com", "hashed_password": hashed,
+                   "role": UserRole.FACULTY.value} for i in range(faculty)]
+        user_ids = {}
+        for chunk in batched(users):
+            user_ids.update(db.execute(insert(User).returning(User.email, User.id), chunk).all())
+
+        student_rows = [{
+            "user_id": user_ids[f"bench-student-{i}@eduzo.example.com"],
+            "enrollment_no": f"BENCH{i:07d}",
+            "full_name": f"Bench Student {i}",
+            "department": rng.choice(DEPARTMENTS),
+            "program": rng.choice(PROGRAMS),
+            "enrollment_year": rng.randint(2019, 2025),
+        } for i in range(students)]
+        student_ids = []
+        for chunk in batched(student_rows):
+            student_ids += db.execute(insert(Student).returning(Student.id, sort_by_parameter_order=True), chunk).scalars().all()
+
+        faculty_rows = [{"user_id": user_ids[f"bench-faculty-{i}@eduzo.example.com"], "department": rng.choice(DEPARTMENTS),
+                         "full_name": f"Bench Faculty {i}"} for i in range(faculty)]
+        for chunk in batched(faculty_rows):
+            db.execute(insert(Faculty), chunk)
+
+        portfolio_rows = [{"student_id": student_ids[i], "is_public": True, "share_token": f"bench-share-{i}"}
+                          for i in range(int(students * public_ratio))]
+        for chunk in batched(portfolio_rows):
+            db.execute(insert(Portfolio), chunk)
+
+        categories = [c.value for c in AchievementCategory]
+        statuses = [AchievementStatus.PENDING.value] * 2 + [AchievementStatus.VERIFIED.value] * 2 + \
+            [AchievementStatus.REJECTED.value]
+        achievement_rows = [{
+            "student_id": student_ids[i],
+            "title": f"{rng.choice(WORDS).title()} {rng.choice(WORDS)} {n}",
+            "description": " ".join(rng.choice(WORDS) for _ in range(12)),
+            "category": rng.choice(categories),
+            "status": rng.choice(statuses),
+        } for i in range(students) for n in range(achievements_per_student)]
+        for chunk in batched(achievement_rows):
+            db.execute(insert(Achievement), chunk)
+
+        db.commit()
+        stats.rebuild_achievement_stats(db)
+        stats.rebuild_leaderboard(db)
+    finally:
+        db.close()
+    return {"users": len(users), "students": students, "faculty": faculty,
+            "portfolios": len(portfolio_rows), "achievements": len(achievement_rows)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Seed synthetic EduZo data for benchmarks")
+    parser.add_argument("--students", type=int, default=1000)
+    parser.add_argument("--faculty", type=int, default=20)
+    parser.add_argument("--achievements", type=int, default=20, help="achievements per student")
+    parser.add_argument("--public-ratio", type=float, default=0.5, help="share of students with a public portfolio")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    counts = seed(args.students, args.faculty, args.achievements, args.public_ratio, random.Random(args.seed))
+    print(f"Seeded {counts} in {time.perf_counter() - started:.1f}s")
@@ -0,0 +1,107 @@
+"""Read/write throughput of the SQLite backend before and after tuning.
+
+Runs the same mixed workload (achievement inserts and status updates against
+portfolio reads) on a plain SQLite engine and on one configured by
+database.enable_sqlite_concurrency, then prints ops/sec and lock errors.
+
+Usage (from backend/):
+    python benchmarks/sqlite_concurrency.py [--seconds 5] [--readers 8] [--writers 4]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, update  # noqa: E402
+from sqlalchemy.exc import OperationalError  # noqa: E402
+from sqlalchemy.orm import sessionmaker, selectinload  # noqa: E402
+from database import Base, enable_sqlite_concurrency  # noqa: E402
+from models import Achievement, AchievementStatus, Student, User  # noqa: E402
+
+STUDENTS = 200
+
+
+def make_engine(path: str, tuned: bool):
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False},
+                           pool_size=32, max_overflow=0)
+    if tuned:
+        enable_sqlite_concurrency(engine)
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine, autoflush=False)
+    with Session() as db:
+        db.add_all(User(email=f"s{i}@bench", hashed_password="x", role="student") for i in range(STUDENTS))
+        db.flush()
+        db.add_all(Student(user_id=i + 1, enrollment_no=f"B{i}", full_name=f"S{i}") for i in range(STUDENTS))
+        db.commit()
+    return engine, Session
+
+
+def run(tuned: bool, seconds: float, readers: int, writers: int) -> dict:
+    path = tempfile.mktemp(suffix=".db")
+    engine, Session = make_engine(path, tuned)
+    counts = {"reads": 0, "writes": 0, "read_errors": 0, "write_errors": 0}
+    lock = threading.Lock()
+    stop = time.monotonic() + seconds
+
+    def bump(key):
+        with lock:
+            counts[key] += 1
+
+    def reader(n):
+        i = n
+        while time.monotonic() < stop:
+            i = (i + 7) % STUDENTS + 1
+            try:
+                with Session() as db:
+                    db.query(Student).options(selectinload(Student.achievements)).filter(Student.id == i).first()
+                bump("reads")
+            except OperationalError:
+                bump("read_errors")
+
+    def writer(n):
+        i = n
+        while time.monotonic() < stop:
+            i = (i + 13) % STUDENTS + 1
+            try:
+                with Session() as db:
+                    achievement = Achievement(student_id=i, title="t", description="d", status=AchievementStatus.PENDING)
+                    db.add(achievement)
+                    db.commit()
+                    db.execute(update(Achievement).where(Achievement.id == achievement.id)
+                               .values(status=AchievementStatus.VERIFIED))
+                    db.commit()
+                bump("writes")
+            except OperationalError:
+                bump("write_errors")
+
+    threads = [threading.Thread(target=reader, args=(n,)) for n in range(readers)]
+    threads += [threading.Thread(target=writer, args=(n,)) for n in range(writers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    engine.dispose()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    return {
+        "reads_per_sec": round(counts["reads"] / seconds, 1),
+        "writes_per_sec": round(counts["writes"] / seconds, 1),
+        "read_errors": counts["read_errors"],
+        "write_errors": counts["write_errors"],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=4)
+    args = parser.parse_args()
+
+    for label, tuned in (("default", False), ("high-concurrency", True)):
+        print(f"{label:>17}: {run(tuned, args.seconds, args.readers, args.writers)}")
@@ -0,0 +1,116 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+try:
+    import redis
+except ImportError:  # Redis is optional for local SQLite development
+    redis = None
+
+REDIS_URL = os.getenv("REDIS_URL")
+
+
+class LRUCache:
+    """Thread-safe in-process LRU with per-entry expiry."""
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: float):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class CacheManager:
+    """Two-tier cache: an in-process LRU in front of an optional shared Redis.
+
+    Values must be JSON serializable. When REDIS_URL is not set (or Redis is
+    unreachable) the cache silently degrades to the local LRU only. With Redis
+    enabled, local entries live at most `local_ttl` seconds so invalidations
+    issued by other workers are picked up quickly.
+    """
+
+    def __init__(self, namespace: str, maxsize: int = 1024, redis_url: Optional[str] = None,
+                 local_ttl: float = 5.0):
+        self.namespace = namespace
+        self.local = LRUCache(maxsize)
+        self.local_ttl = local_ttl
+        self.client = None
+        redis_url = redis_url or REDIS_URL
+        if redis is not None and redis_url:
+            try:
+                self.client = redis.from_url(redis_url, decode_responses=True)
+                self.client.ping()
+            except Exception as e:
+                print(f"Warning: Redis connection failed. Using in-process cache for '{namespace}'. Error: {e}")
+                self.client = None
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.local.get(key)
+        if value is not None or self.client is None:
+            return value
+        try:
+            data = self.client.get(self._key(key))
+            ttl = self.client.ttl(self._key(key)) if data is not None else 0
+        except Exception:
+            return None
+        if data is None:
+            return None
+        try:
+            value = json.loads(data)
+        except json.JSONDecodeError:
+            return None
+        if ttl and ttl > 0:
+            self.local.set(key, value, min(ttl, self.local_ttl))
+        return value
+
+    def set(self, key: str, value: Any, ttl: float):
+        if ttl <= 0:
+            return
+        if self.client is None:
+            self.local.set(key, value, ttl)
+            return
+        self.local.set(key, value, min(ttl, self.local_ttl))
+        try:
+            self.client.setex(self._key(key), max(int(ttl), 1), json.dumps(value, default=str))
+        except Exception:
+            pass
+
+    def delete(self, key: str):
+        self.local.delete(key)
+        if self.client is not None:
+            try:
+                self.client.delete(self._key(key))
+            except Exception:
+                pass
@@ -1,14 +1,164 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from contextvars import ContextVar
+from typing import Optional
+import itertools
 import os
+import threading
+import time
 
 SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./sql_app.db")
+# Comma-separated read replicas of DATABASE_URL; read-only routes use them
+DATABASE_REPLICA_URLS = [u.strip() for u in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if u.strip()]
+# After a user writes, their reads stay on the primary for this long
+REPLICA_STICKY_SECONDS = float(os.getenv("REPLICA_STICKY_SECONDS", "5"))
+# How long a replica that failed to connect is skipped
+REPLICA_RETRY_SECONDS = float(os.getenv("REPLICA_RETRY_SECONDS", "30"))
 
-if SQLALCHEMY_DATABASE_URL.startswith("sqlite"):
-    engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
-else:
-    engine = create_engine(SQLALCHEMY_DATABASE_URL)
+# Pool tuning, shared by the sync and async engines
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "false").lower() == "true"
+# Serve the auth hot path from an AsyncSession (asyncpg / aiosqlite)
+DB_ASYNC = os.getenv("DB_ASYNC", "false").lower() == "true"
+
+# SQLite deployment mode for small campuses: WAL + pragmas + single writer
+SQLITE_HIGH_CONCURRENCY = os.getenv("SQLITE_HIGH_CONCURRENCY", "false").lower() == "true"
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE", "-65536"))  # negative = KiB, i.e. 64 MiB
+
+
+class PoolMetrics:
+    """How long requests wait to check a connection out of the pool"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+                return
+            self.checkouts += 1
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_seconds_total": round(self.wait_seconds_total, 6),
+                "wait_seconds_max": round(self.wait_seconds_max, 6),
+                "avg_wait_seconds": round(self.wait_seconds_total / self.checkouts, 6) if self.checkouts else 0.0,
+            }
+
+
+pool_metrics = {"sync": PoolMetrics(), "async": PoolMetrics()}
+
+
+def _timed_pool(pool_cls, metrics: PoolMetrics):
+    """Subclass a queue pool so every checkout records its wait time"""
+
+    class TimedPool(pool_cls):
+        def _do_get(self):
+            started = time.perf_counter()
+            try:
+                conn = super()._do_get()
+            except Exception:
+                metrics.record(time.perf_counter() - started, timed_out=True)
+                raise
+            metrics.record(time.perf_counter() - started)
+            return conn
+
+    TimedPool.__name__ = f"Timed{pool_cls.__name__}"
+    return TimedPool
+
+
+def _engine_options(url: str, pool_cls, metrics: PoolMetrics) -> dict:
+    if url.startswith("sqlite") and ":memory:" in url:
+        # In-memory SQLite must keep its single connection
+        return {"connect_args": {"check_same_thread": False}}
+    options = {
+        "poolclass": _timed_pool(pool_cls, metrics),
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+    if url.startswith("sqlite"):
+        options["connect_args"] = {"check_same_thread": False}
+    return options
+
+
+_READ_PREFIXES = ("SELECT", "PRAGMA", "EXPLAIN")
+
+
+def enable_sqlite_concurrency(engine):
+    """Tune a file-backed SQLite engine for many readers and one writer.
+
+    Every new connection gets WAL journaling, synchronous=NORMAL, a busy
+    timeout and larger mmap/page caches. Within the process, write
+    transactions are funnelled through one lock taken at the first DML
+    statement and released on commit/rollback, so concurrent requests queue
+    for the writer slot instead of failing with "database is locked"; WAL
+    lets reads proceed alongside. Writers in other processes are covered by
+    busy_timeout.
+    """
+    writer_lock = threading.Lock()
+    lock_timeout = SQLITE_BUSY_TIMEOUT_MS / 1000
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+        cursor.execute(f"PRAGMA cache_size={SQLITE_CACHE_SIZE}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.close()
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _acquire_writer(conn, cursor, statement, parameters, context, executemany):
+        if conn.info.get("sqlite_writer") or statement.lstrip().upper().startswith(_READ_PREFIXES):
+            return
+        # On timeout carry on and let SQLite's own busy handler arbitrate
+        conn.info["sqlite_writer"] = writer_lock.acquire(timeout=lock_timeout)
+
+    def _release_writer(info):
+        if info.pop("sqlite_writer", False):
+            writer_lock.release()
+
+    @event.listens_for(engine, "commit")
+    def _release_on_commit(conn):
+        _release_writer(conn.info)
+
+    @event.listens_for(engine, "rollback")
+    def _release_on_rollback(conn):
+        _release_writer(conn.info)
+
+    @event.listens_for(engine, "checkin")
+    def _release_on_checkin(dbapi_connection, connection_record):
+        _release_writer(connection_record.info)
+
+    return engine
+
+
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **_engine_options(SQLALCHEMY_DATABASE_URL, QueuePool, pool_metrics["sync"]))
+if SQLITE_HIGH_CONCURRENCY and SQLALCHEMY_DATABASE_URL.startswith("sqlite") and ":memory:" not in SQLALCHEMY_DATABASE_URL:
+    enable_sqlite_concurrency(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
@@ -19,3 +169,132 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# Identity used for read-your-writes stickiness; set by auth.get_current_user
+sticky_key: ContextVar[Optional[str]] = ContextVar("sticky_key", default=None)
+
+
+class ReplicaRouter:
+    """Round-robin over healthy replicas with read-your-writes stickiness.
+
+    Recent writers are remembered in the shared cache (Redis when
+    configured) so stickiness holds across workers; replicas that fail to
+    hand out a connection are skipped for REPLICA_RETRY_SECONDS.
+    """
+
+    def __init__(self, urls):
+        self.replicas = []
+        for url in urls:
+            replica = create_engine(url, **_engine_options(url, QueuePool, pool_metrics["sync"]))
+            self.replicas.append((replica, sessionmaker(autocommit=False, autoflush=False, bind=replica)))
+        self._cycle = itertools.count()
+        self._down_until = {}
+        self.recent_writes = None
+        if self.replicas:
+            from cache import CacheManager
+            self.recent_writes = CacheManager("recent_write", maxsize=65536, local_ttl=REPLICA_STICKY_SECONDS)
+
+    def mark_write(self, key: Optional[str]):
+        if key and self.recent_writes is not None:
+            self.recent_writes.set(key, 1, REPLICA_STICKY_SECONDS)
+
+    def _candidates(self, key: Optional[str]):
+        if not self.replicas or (key and self.recent_writes.get(key) is not None):
+            return []
+        now = time.monotonic()
+        start = next(self._cycle)
+        ordered = [self.replicas[(start + i) % len(self.replicas)] for i in range(len(self.replicas))]
+        return [r for r in ordered if self._down_until.get(r[0], 0) <= now]
+
+    def session(self, key: Optional[str] = None):
+        """A session on the next healthy replica, falling back to the primary"""
+        for replica, factory in self._candidates(key):
+            db = factory()
+            try:
+                db.connection()  # check out now so a dead replica is detected here
+                return db
+            except OperationalError:
+                db.close()
+                self._down_until[replica] = time.monotonic() + REPLICA_RETRY_SECONDS
+                print(f"Warning: read replica {replica.url!r} unavailable, skipping for {REPLICA_RETRY_SECONDS}s")
+        return SessionLocal()
+
+
+replica_router = ReplicaRouter(DATABASE_REPLICA_URLS)
+
+
+def mark_recent_write(key: Optional[str]):
+    """Pin reads for `key` to the primary for REPLICA_STICKY_SECONDS"""
+    replica_router.mark_write(key)
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _flag_flush(session, flush_context):
+    session.info["wrote"] = True
+
+
+@event.listens_for(SessionLocal, "do_orm_execute")
+def _flag_bulk_write(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["wrote"] = True
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _stick_after_write(session):
+    if session.info.pop("wrote", False):
+        mark_recent_write(sticky_key.get())
+
+
+def get_read_db():
+    """Session for read-only routes; declare it after get_current_user so
+    the caller's identity is known for read-your-writes"""
+    db = replica_router.session(sticky_key.get())
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def async_database_url(url: str) -> str:
+    """Map a sync DATABASE_URL onto its async driver"""
+    if url.startswith("postgresql://") or url.startswith("postgresql+psycopg2://"):
+        return "postgresql+asyncpg://" + url.split("://", 1)[1]
+    if url.startswith("sqlite://") or url.startswith("sqlite+pysqlite://"):
+        return "sqlite+aiosqlite://" + url.split("://", 1)[1]
+    return url
+
+
+async_engine = None
+AsyncSessionLocal = None
+
+if DB_ASYNC:
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+    ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", async_database_url(SQLALCHEMY_DATABASE_URL))
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, **_engine_options(ASYNC_DATABASE_URL, AsyncAdaptedQueuePool, pool_metrics["async"]))
+    AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def pool_status() -> dict:
+    """Pool occupancy plus checkout wait metrics for /metrics endpoints"""
+    status = {"sync": {**_pool_state(engine.pool), "wait": pool_metrics["sync"].snapshot()}}
+    if async_engine is not None:
+        status["async"] = {**_pool_state(async_engine.pool), "wait": pool_metrics["async"].snapshot()}
+    return status
+
+
+def _pool_state(pool) -> dict:
+    if not hasattr(pool, "checkedout"):
+        return {"pool": type(pool).__name__}
+    return {
+        "pool": type(pool).__name__,
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "checked_in": pool.checkedin(),
+    }
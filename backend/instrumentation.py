@@ -0,0 +1,112 @@
+"""Backend-specific metrics: SQL statements per request, slow queries, and
+gauges for the connection pool and password hashing executor."""
+from contextvars import ContextVar
+from typing import Optional
+from fastapi import Request
+from prometheus_client import Counter, Histogram
+from prometheus_client.core import GaugeMetricFamily
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from metrics import route_template
+import logging
+import os
+import time
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+
+logger = logging.getLogger("backend.sql")
+
+SQL_STATEMENTS_PER_REQUEST = Histogram(
+    "db_statements_per_request",
+    "SQL statements executed while handling a request",
+    ["route"],
+    buckets=(0, 1, 2, 3, 4, 5, 8, 13, 21, 34, 55, 100),
+)
+SQL_SECONDS_PER_REQUEST = Histogram(
+    "db_seconds_per_request",
+    "Time spent executing SQL while handling a request",
+    ["route"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+SLOW_QUERIES = Counter("db_slow_queries_total", "Statements slower than SLOW_QUERY_MS", ["route"])
+
+
+class RequestSQLStats:
+    __slots__ = ("request", "statements", "seconds")
+
+    def __init__(self, request: Optional[Request]):
+        self.request = request
+        self.statements = 0
+        self.seconds = 0.0
+
+
+_current: ContextVar[Optional[RequestSQLStats]] = ContextVar("request_sql_stats", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _stop_timer(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    stats = _current.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.seconds += elapsed
+    if elapsed * 1000 >= SLOW_QUERY_MS:
+        route = route_template(stats.request) if stats is not None and stats.request is not None else "-"
+        SLOW_QUERIES.labels(route).inc()
+        logger.warning("Slow query (%.1f ms) on %s: %s", elapsed * 1000, route, " ".join(statement.split())[:500])
+
+
+@event.listens_for(Engine, "handle_error")
+def _drop_timer(exception_context):
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_started"):
+        conn.info["query_started"].pop()
+
+
+class SQLRequestHook:
+    """metrics.install_metrics hook attributing SQL work to the current route"""
+
+    def start(self, request: Request):
+        return _current.set(RequestSQLStats(request))
+
+    def finish(self, request: Request, route: str, token):
+        stats = _current.get()
+        _current.reset(token)
+        if stats is not None:
+            SQL_STATEMENTS_PER_REQUEST.labels(route).observe(stats.statements)
+            SQL_SECONDS_PER_REQUEST.labels(route).observe(stats.seconds)
+
+
+class BackendStateCollector:
+    """Expose pool occupancy/wait and password hashing counters at scrape time"""
+
+    def collect(self):
+        from database import pool_status
+        from auth import hash_metrics
+
+        pool = GaugeMetricFamily("db_pool_connections", "Connection pool occupancy", labels=["engine", "state"])
+        wait = GaugeMetricFamily("db_pool_wait_seconds", "Pool checkout wait", labels=["engine", "stat"])
+        for name, state in pool_status().items():
+            for key in ("size", "checked_out", "overflow", "checked_in"):
+                if key in state:
+                    pool.add_metric([name, key], state[key])
+            for key in ("checkouts", "timeouts", "wait_seconds_total", "wait_seconds_max"):
+                wait.add_metric([name, key], state["wait"][key])
+        yield pool
+        yield wait
+
+        hashing = hash_metrics.snapshot()
+        ops = GaugeMetricFamily("password_hash_operations", "Password hash operations", labels=["op"])
+        seconds = GaugeMetricFamily("password_hash_seconds_total", "Time spent hashing", labels=["op"])
+        for op, count in hashing["operations"].items():
+            ops.add_metric([op], count)
+            seconds.add_metric([op], hashing["seconds_total"][op])
+        yield ops
+        yield seconds
+        yield GaugeMetricFamily("password_hash_queued", "Hashes waiting for the executor", value=hashing["queued"])
+        yield GaugeMetricFamily("password_hash_in_flight", "Hashes running", value=hashing["in_flight"])
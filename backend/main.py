@@ -1,11 +1,25 @@
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 import uvicorn
 import os
-from database import engine, Base
-from routers import auth, portfolio
+from database import engine, Base, SessionLocal, pool_status
+from sqlalchemy import text
+from routers import auth, portfolio, roster, evidence
+from auth import hash_metrics
+from metrics import install_metrics
+from instrumentation import SQLRequestHook, BackendStateCollector
+import stats
+import search
 
 # Create tables
 Base.metadata.create_all(bind=engine)
+with engine.begin() as connection:
+    search.create_search_index(connection)
+
+# Seed analytics counters and leaderboards for databases created before they existed
+with SessionLocal() as db:
+    stats.ensure_achievement_stats(db)
+    stats.ensure_leaderboard(db)
 
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -17,14 +31,37 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
+install_metrics(app, "backend", hooks=[SQLRequestHook()], collectors=[BackendStateCollector()])
+
 app.include_router(auth.router)
 app.include_router(portfolio.router)
+app.include_router(roster.router)
+app.include_router(evidence.router)
 
 @app.get("/health")
 async def health_check():
     return {"status": "healthy", "service": "backend"}
 
+@app.get("/ready")
+def readiness_check():
+    """Ready once the database answers; used by run_all.py to gate startup"""
+    try:
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+    except Exception as e:
+        return JSONResponse(status_code=503, content={"status": "unavailable", "detail": str(e)})
+    return {"status": "ready", "service": "backend"}
+
+@app.get("/metrics/password-hashing")
+async def password_hashing_metrics():
+    return hash_metrics.snapshot()
+
+@app.get("/metrics/db-pool")
+async def db_pool_metrics():
+    return pool_status()
+
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
@@ -0,0 +1,102 @@
+"""Baseline schema: users, students, faculty, achievements and portfolios
+
+Revision ID: 0000
+Revises:
+Create Date: 2026-10-19
+
+The tables as they were before migrations were introduced. Databases
+created by Base.metadata.create_all() on startup already have them, so
+everything here tolerates existing tables and indexes; a fresh database can
+be brought up with `alembic upgrade head` alone.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0000"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("email", sa.String(), nullable=True),
+        sa.Column("hashed_password", sa.String(), nullable=True),
+        sa.Column("role", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        if_not_exists=True,
+    )
+    op.create_index("ix_users_id", "users", ["id"], if_not_exists=True)
+    op.create_index("ix_users_email", "users", ["email"], unique=True, if_not_exists=True)
+
+    op.create_table(
+        "students",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=True),
+        sa.Column("enrollment_no", sa.String(), nullable=True),
+        sa.Column("full_name", sa.String(), nullable=True),
+        sa.Column("department", sa.String(), nullable=True),
+        sa.Column("program", sa.String(), nullable=True),
+        sa.Column("enrollment_year", sa.Integer(), nullable=True),
+        sa.Column("current_semester", sa.Integer(), nullable=True),
+        sa.Column("gpa", sa.String(), nullable=True),
+        sa.Column("phone_number", sa.String(), nullable=True),
+        sa.Column("date_of_birth", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("bio", sa.Text(), nullable=True),
+        if_not_exists=True,
+    )
+    op.create_index("ix_students_id", "students", ["id"], if_not_exists=True)
+    op.create_index("ix_students_enrollment_no", "students", ["enrollment_no"], unique=True, if_not_exists=True)
+
+    op.create_table(
+        "faculty",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=True),
+        sa.Column("department", sa.String(), nullable=True),
+        sa.Column("full_name", sa.String(), nullable=True),
+        if_not_exists=True,
+    )
+    op.create_index("ix_faculty_id", "faculty", ["id"], if_not_exists=True)
+
+    op.create_table(
+        "achievements",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("student_id", sa.Integer(), sa.ForeignKey("students.id"), nullable=True),
+        sa.Column("title", sa.String(), nullable=True),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("category", sa.String(), nullable=True),
+        sa.Column("date_achieved", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("evidence_url", sa.String(), nullable=True),
+        sa.Column("status", sa.String(), nullable=True),
+        sa.Column("verified_by", sa.Integer(), sa.ForeignKey("faculty.id"), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        if_not_exists=True,
+    )
+    op.create_index("ix_achievements_id", "achievements", ["id"], if_not_exists=True)
+
+    op.create_table(
+        "portfolios",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("student_id", sa.Integer(), sa.ForeignKey("students.id"), nullable=True),
+        sa.Column("is_public", sa.Boolean(), nullable=True),
+        sa.Column("share_token", sa.String(), nullable=True),
+        if_not_exists=True,
+    )
+    op.create_index("ix_portfolios_id", "portfolios", ["id"], if_not_exists=True)
+    op.create_index("ix_portfolios_share_token", "portfolios", ["share_token"], unique=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("portfolios", if_exists=True)
+    op.drop_table("achievements", if_exists=True)
+    op.drop_table("faculty", if_exists=True)
+    op.drop_table("students", if_exists=True)
+    op.drop_table("users", if_exists=True)
@@ -0,0 +1,31 @@
+"""Indexes for the faculty pending-achievements queue
+
+Revision ID: 0001
+Revises: 0000
+Create Date: 2026-10-19
+
+Base.metadata.create_all() on startup also creates these indexes on fresh
+databases, so this tolerates them already existing.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, Sequence[str], None] = "0000"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index("ix_achievements_status_created_at", "achievements", ["status", "created_at"], if_not_exists=True)
+    op.create_index("ix_achievements_student_id", "achievements", ["student_id"], if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_achievements_student_id", table_name="achievements", if_exists=True)
+    op.drop_index("ix_achievements_status_created_at", table_name="achievements", if_exists=True)
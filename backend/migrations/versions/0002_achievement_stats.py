@@ -0,0 +1,36 @@
+"""Summary table for faculty analytics counters
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+
+Populate it afterwards with `python stats.py rebuild` (the backend also
+seeds it on startup when the table is empty).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, Sequence[str], None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "achievement_stats",
+        sa.Column("status", sa.String(), primary_key=True),
+        sa.Column("category", sa.String(), primary_key=True),
+        sa.Column("count", sa.Integer(), nullable=False, server_default="0"),
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("achievement_stats", if_exists=True)
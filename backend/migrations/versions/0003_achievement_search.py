@@ -0,0 +1,30 @@
+"""Full-text search index over achievements
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+
+FTS5 table + sync triggers on SQLite, GIN tsvector index on Postgres.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from search import create_search_index, drop_search_index
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, Sequence[str], None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    create_search_index(op.get_bind())
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    drop_search_index(op.get_bind())
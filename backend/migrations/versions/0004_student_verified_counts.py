@@ -0,0 +1,53 @@
+"""Per-student verified counts backing the leaderboards
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+
+Populate it afterwards with `python stats.py rebuild` (the backend also
+seeds it on startup when the table is empty).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, Sequence[str], None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "student_verified_counts",
+        sa.Column("student_id", sa.Integer(), sa.ForeignKey("students.id"), primary_key=True),
+        sa.Column("category", sa.String(), primary_key=True),
+        sa.Column("department", sa.String(), nullable=True),
+        sa.Column("program", sa.String(), nullable=True),
+        sa.Column("verified_count", sa.Integer(), nullable=False, server_default="0"),
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_leaderboard_category", "student_verified_counts",
+        ["category", sa.text("verified_count DESC"), "student_id"], if_not_exists=True,
+    )
+    op.create_index(
+        "ix_leaderboard_department", "student_verified_counts",
+        ["category", "department", sa.text("verified_count DESC"), "student_id"], if_not_exists=True,
+    )
+    op.create_index(
+        "ix_leaderboard_program", "student_verified_counts",
+        ["category", "program", sa.text("verified_count DESC"), "student_id"], if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_leaderboard_program", table_name="student_verified_counts", if_exists=True)
+    op.drop_index("ix_leaderboard_department", table_name="student_verified_counts", if_exists=True)
+    op.drop_index("ix_leaderboard_category", table_name="student_verified_counts", if_exists=True)
+    op.drop_table("student_verified_counts", if_exists=True)
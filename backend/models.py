@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, Enum, DateTime, Text
+from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, Enum, DateTime, Text, Index, desc
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -72,18 +72,59 @@ class Achievement(Base):
     __tablename__ = "achievements"
 
     id = Column(Integer, primary_key=True, index=True)
-    student_id = Column(Integer, ForeignKey("students.id"))
+    student_id = Column(Integer, ForeignKey("students.id"), index=True)
     title = Column(String)
     description = Column(Text)
     category = Column(String, default=AchievementCategory.OTHER)
     date_achieved = Column(DateTime(timezone=True), nullable=True)
-    evidence_url = Column(String, nullable=True)  # For future file upload support
+    evidence_url = Column(String, nullable=True)  # Set by the evidence upload endpoint
     status = Column(String, default=AchievementStatus.PENDING)
     verified_by = Column(Integer, ForeignKey("faculty.id"), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     student = relationship("Student", back_populates="achievements")
 
+    __table_args__ = (
+        # Faculty pending queue: filter by status, keyset-paginate on created_at
+        Index("ix_achievements_status_created_at", "status", "created_at"),
+    )
+
+class AchievementStat(Base):
+    """Incrementally maintained achievement counts per (status, category).
+
+    Kept in sync by stats.apply_stat_deltas in the same transaction as the
+    achievement writes; rebuild with `python stats.py rebuild`.
+    """
+    __tablename__ = "achievement_stats"
+
+    status = Column(String, primary_key=True)
+    category = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+class StudentVerifiedCount(Base):
+    """Verified achievements per student and category, for leaderboards.
+
+    Department and program are copied from the student so each leaderboard
+    is a range scan over one index; category ALL_CATEGORIES holds the
+    student's total. Kept in sync by stats.apply_leaderboard_deltas.
+    """
+    __tablename__ = "student_verified_counts"
+
+    student_id = Column(Integer, ForeignKey("students.id"), primary_key=True)
+    category = Column(String, primary_key=True)
+    department = Column(String, nullable=True)
+    program = Column(String, nullable=True)
+    verified_count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        Index("ix_leaderboard_category", "category", desc("verified_count"), "student_id"),
+        Index("ix_leaderboard_department", "category", "department", desc("verified_count"), "student_id"),
+        Index("ix_leaderboard_program", "category", "program", desc("verified_count"), "student_id"),
+    )
+
+# Category key of the per-student total row in student_verified_counts
+ALL_CATEGORIES = "ALL"
+
 class Portfolio(Base):
     __tablename__ = "portfolios"
 
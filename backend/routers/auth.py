@@ -1,11 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from fastapi.security import OAuth2PasswordRequestForm
 from datetime import timedelta
-from database import get_db
+from database import get_db, DB_ASYNC
 from models import User, Student, Faculty, UserRole
 from schemas import UserCreate, UserResponse, Token
-from auth import get_password_hash, verify_password, create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES
+from auth import (
+    hash_password_bounded, verify_password_async, create_access_token, login_limiter, get_auth_db,
+    ACCESS_TOKEN_EXPIRE_MINUTES,
+)
 
 router = APIRouter(
     prefix="/api/auth",
@@ -18,7 +23,7 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
     if db_user:
         raise HTTPException(status_code=400, detail="Email already registered")
     
-    hashed_password = get_password_hash(user.password)
+    hashed_password = hash_password_bounded(user.password)
     new_user = User(
         email=user.email,
         hashed_password=hashed_password,
@@ -49,15 +54,38 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
     db.commit()
     return new_user
 
+def get_user_by_email(db: Session, email: str):
+    return db.query(User).filter(User.email == email).first()
+
 @router.post("/login", response_model=Token)
-async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
+async def login_for_access_token(
+    request: Request,
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    db=Depends(get_auth_db)
+):
+    # request.client is the X-Forwarded-For address when the request came
+    # through a trusted proxy (uvicorn --proxy-headers / FORWARDED_ALLOW_IPS)
+    client_ip = request.client.host if request.client else "unknown"
+    if not login_limiter.allowed(client_ip, form_data.username):
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts, try again later",
+            headers={"Retry-After": str(login_limiter.retry_after())},
+        )
+
+    # Neither the query nor pbkdf2 may run on the event loop
+    if DB_ASYNC:
+        user = (await db.execute(select(User).where(User.email == form_data.username))).scalars().first()
+    else:
+        user = await run_in_threadpool(get_user_by_email, db, form_data.username)
+    if not user or not await verify_password_async(form_data.password, user.hashed_password):
+        login_limiter.failed(client_ip, form_data.username)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    login_limiter.succeeded(client_ip, form_data.username)
     
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
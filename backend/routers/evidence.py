@@ -0,0 +1,224 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse
+try:
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ImportError:  # python-multipart < 0.0.13
+    from multipart.multipart import MultipartParser, parse_options_header
+from sqlalchemy.orm import Session
+from database import get_db
+from models import Achievement, UserRole
+from schemas import AchievementResponse, Principal
+from auth import get_current_user
+from routers.portfolio import etag_matches, invalidate_public_portfolio
+import hashlib
+import os
+import re
+import tempfile
+
+router = APIRouter(
+    prefix="/api/portfolio",
+    tags=["evidence"]
+)
+
+EVIDENCE_DIR = os.path.abspath(os.getenv("EVIDENCE_DIR", "evidence"))
+# gateway/nginx.conf caps the upload body just above this plus
+# MULTIPART_OVERHEAD_BYTES; raise its client_max_body_size along with it
+EVIDENCE_MAX_BYTES = int(os.getenv("EVIDENCE_MAX_BYTES", str(10 * 1024 * 1024)))
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+# When set (e.g. "/_evidence/"), downloads are handed to the gateway via
+# X-Accel-Redirect so nginx serves the file with sendfile instead of Python
+EVIDENCE_ACCEL_PREFIX = os.getenv("EVIDENCE_ACCEL_PREFIX")
+EVIDENCE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Accepted evidence types, identified by their leading bytes rather than the
+# client supplied Content-Type
+EVIDENCE_TYPES = {
+    "pdf": "application/pdf",
+    "png": "image/png",
+    "jpg": "image/jpeg",
+    "webp": "image/webp",
+}
+EVIDENCE_NAME = re.compile(r"^([0-9a-f]{64})\.(pdf|png|jpg|webp)$")
+SNIFF_BYTES = 16
+
+def sniff_extension(head: bytes) -> str:
+    if head.startswith(b"%PDF-"):
+        return "pdf"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if head.startswith(b"\xff\xd8\xff"):
+        return "jpg"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "webp"
+    return None
+
+def evidence_path(name: str) -> str:
+    """Blobs are fanned out by the first two hex digits of their hash"""
+    return os.path.join(EVIDENCE_DIR, name[:2], name)
+
+class EvidenceUpload:
+    """Incremental multipart sink: the named file part is written to a temp
+    file chunk by chunk while its SHA-256 is computed; other parts are ignored"""
+
+    def __init__(self, boundary: bytes, field: str = "file"):
+        self.field = field.encode()
+        self.hasher = hashlib.sha256()
+        self.size = 0
+        self.head = b""
+        self.found = False
+        self._in_file = False
+        self._headers = {}
+        self._header_field = b""
+        self._header_value = b""
+        os.makedirs(os.path.join(EVIDENCE_DIR, "tmp"), exist_ok=True)
+        self.file = tempfile.NamedTemporaryFile(dir=os.path.join(EVIDENCE_DIR, "tmp"), delete=False)
+        self.parser = MultipartParser(boundary, {
+            "on_part_begin": self._on_part_begin,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+        })
+
+    def _on_part_begin(self):
+        self._headers = {}
+
+    def _on_header_field(self, data, start, end):
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data, start, end):
+        self._header_value += data[start:end]
+
+    def _on_header_end(self):
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = b""
+        self._header_value = b""
+
+    def _on_headers_finished(self):
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        self._in_file = not self.found and options.get(b"name") == self.field and b"filename" in options
+
+    def _on_part_data(self, data, start, end):
+        if not self._in_file:
+            return
+        chunk = data[start:end]
+        self.size += len(chunk)
+        if self.size > EVIDENCE_MAX_BYTES:
+            raise HTTPException(status_code=413, detail=f"Evidence files are limited to {EVIDENCE_MAX_BYTES} bytes")
+        if len(self.head) < SNIFF_BYTES:
+            self.head += chunk[:SNIFF_BYTES - len(self.head)]
+        self.hasher.update(chunk)
+        self.file.write(chunk)
+
+    def _on_part_end(self):
+        if self._in_file:
+            self.found = True
+            self._in_file = False
+
+    def write(self, chunk: bytes):
+        self.parser.write(chunk)
+
+    def store(self) -> str:
+        """Move the upload to its content address; identical files are kept once"""
+        self.parser.finalize()
+        self.file.close()
+        if not self.found or self.size == 0:
+            raise HTTPException(status_code=400, detail="Expected a non-empty 'file' part")
+        extension = sniff_extension(self.head)
+        if extension is None:
+            raise HTTPException(status_code=415, detail="Evidence must be a PDF, PNG, JPEG or WebP file")
+        name = f"{self.hasher.hexdigest()}.{extension}"
+        path = evidence_path(name)
+        if os.path.exists(path):
+            os.unlink(self.file.name)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(self.file.name, path)
+        return name
+
+    def discard(self):
+        self.file.close()
+        if os.path.exists(self.file.name):
+            os.unlink(self.file.name)
+
+def get_owned_achievement(db: Session, achievement_id: int, current_user: Principal) -> Achievement:
+    if current_user.role != UserRole.STUDENT:
+        raise HTTPException(status_code=403, detail="Only students can attach evidence")
+    achievement = db.query(Achievement).filter(
+        Achievement.id == achievement_id,
+        Achievement.student_id == current_user.student_id,
+    ).first()
+    if achievement is None:
+        raise HTTPException(status_code=404, detail="Achievement not found")
+    # Don't hold a pooled connection open while the body is streamed
+    db.rollback()
+    return achievement
+
+def attach_evidence(db: Session, achievement: Achievement, name: str) -> Achievement:
+    achievement.evidence_url = f"{router.prefix}/evidence/{name}"
+    db.commit()
+    db.refresh(achievement)
+    invalidate_public_portfolio(db, student_id=achievement.student_id)
+    return achievement
+
+@router.post("/achievements/{achievement_id}/evidence", response_model=AchievementResponse)
+async def upload_evidence(
+    achievement_id: int,
+    request: Request,
+    current_user: Principal = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Attach a certificate to one of the caller's achievements.
+
+    The multipart body is parsed as it arrives, so memory use stays at one
+    chunk regardless of file size.
+    """
+    achievement = await run_in_threadpool(get_owned_achievement, db, achievement_id, current_user)
+
+    content_type, options = parse_options_header(request.headers.get("content-type", ""))
+    boundary = options.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise HTTPException(status_code=400, detail="Expected a multipart/form-data body")
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > EVIDENCE_MAX_BYTES + MULTIPART_OVERHEAD_BYTES:
+        raise HTTPException(status_code=413, detail=f"Evidence files are limited to {EVIDENCE_MAX_BYTES} bytes")
+
+    upload = EvidenceUpload(boundary)
+    try:
+        async for chunk in request.stream():
+            if chunk:
+                await run_in_threadpool(upload.write, chunk)
+        name = await run_in_threadpool(upload.store)
+    except BaseException:
+        upload.discard()
+        raise
+
+    return await run_in_threadpool(attach_evidence, db, achievement, name)
+
+@router.get("/evidence/{name}")
+def download_evidence(name: str, request: Request):
+    """Serve a stored evidence file.
+
+    Names are content hashes, so the URL acts as an unguessable capability
+    and the response never changes: it is cached as immutable and the hash
+    doubles as the ETag. Range requests are handled by FileResponse (or by
+    nginx when EVIDENCE_ACCEL_PREFIX is configured).
+    """
+    match = EVIDENCE_NAME.match(name)
+    if match is None:
+        raise HTTPException(status_code=404, detail="Evidence not found")
+    path = evidence_path(name)
+    if not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail="Evidence not found")
+
+    media_type = EVIDENCE_TYPES[match.group(2)]
+    headers = {"ETag": f'"{match.group(1)}"', "Cache-Control": EVIDENCE_CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    if EVIDENCE_ACCEL_PREFIX:
+        headers["X-Accel-Redirect"] = f"{EVIDENCE_ACCEL_PREFIX.rstrip('/')}/{name[:2]}/{name}"
+        return Response(media_type=media_type, headers=headers)
+    return FileResponse(path, media_type=media_type, headers=headers)
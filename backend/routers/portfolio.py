@@ -1,11 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import and_, or_, update
+from sqlalchemy.orm import Session, joinedload, contains_eager, selectinload
+from typing import List, Literal, Optional
 from datetime import datetime, date
-from database import get_db
-from models import User, Achievement, AchievementStatus, UserRole, Student
-from schemas import AchievementCreate, AchievementResponse, PortfolioResponse, ProfileUpdateRequest
-from auth import get_current_user
+from database import get_db, get_read_db, replica_router, mark_recent_write
+from models import Achievement, AchievementStatus, AchievementCategory, UserRole, Student, Portfolio
+from schemas import (
+    AchievementCreate, AchievementResponse, PortfolioResponse, ProfileUpdateRequest, Principal,
+    BulkVerifyRequest, BulkVerifyResponse, LeaderboardEntry, StudentRank,
+)
+from collections import Counter
+from auth import get_current_user, invalidate_principal
+from cache import CacheManager
+import search
+import stats
+import hashlib
+import os
 import uuid
 
 router = APIRouter(
@@ -13,17 +23,60 @@ router = APIRouter(
     tags=["portfolio"]
 )
 
+PUBLIC_PORTFOLIO_CACHE_TTL = int(os.getenv("PUBLIC_PORTFOLIO_CACHE_TTL", "600"))
+PUBLIC_PORTFOLIO_MAX_AGE = int(os.getenv("PUBLIC_PORTFOLIO_MAX_AGE", "60"))
+VERIFY_ATTEMPTS = 3
+
+# Rendered public portfolios keyed by share token
+public_portfolio_cache = CacheManager("public_portfolio", maxsize=2048)
+
+def invalidate_public_portfolio(db: Session, student_id: int = None, share_token: str = None):
+    """Drop the cached public view of a student's portfolio"""
+    if share_token is None and student_id is not None:
+        share_token = db.query(Portfolio.share_token).filter(Portfolio.student_id == student_id).scalar()
+    if share_token:
+        public_portfolio_cache.delete(share_token)
+        mark_recent_write(f"share:{share_token}")
+
+def invalidate_public_portfolios(db: Session, student_ids):
+    """Batch variant of invalidate_public_portfolio: one lookup for all students"""
+    if not student_ids:
+        return
+    tokens = db.query(Portfolio.share_token).filter(Portfolio.student_id.in_(student_ids)).all()
+    for (share_token,) in tokens:
+        if share_token:
+            public_portfolio_cache.delete(share_token)
+            mark_recent_write(f"share:{share_token}")
+
+def render_public_portfolio(share_token: str):
+    """Render a public portfolio for the cache, or None if it isn't shared.
+
+    Reads go to a replica, except right after the portfolio changed (then
+    the primary) so the re-rendered cache entry is never stale. The session
+    is only opened here, on a cache miss.
+    """
+    db = replica_router.session(f"share:{share_token}")
+    try:
+        # Only verified achievements are shown publicly
+        student = load_student_portfolio(db, share_token=share_token, verified_only=True)
+        if not student:
+            return None
+        body = PortfolioResponse.model_validate(portfolio_response(student, private=False)).model_dump_json()
+    finally:
+        db.close()
+    return {"body": body, "etag": '"%s"' % hashlib.sha256(body.encode()).hexdigest()[:32]}
+
 @router.post("/achievements", response_model=AchievementResponse)
 def add_achievement(
     achievement: AchievementCreate, 
-    current_user: User = Depends(get_current_user), 
+    current_user: Principal = Depends(get_current_user), 
     db: Session = Depends(get_db)
 ):
     if current_user.role != UserRole.STUDENT:
         raise HTTPException(status_code=403, detail="Only students can add achievements")
 
     new_achievement = Achievement(
-        student_id=current_user.student_profile.id,
+        student_id=current_user.student_id,
         title=achievement.title,
         description=achievement.description,
         category=achievement.category,  # Save category from request
@@ -31,10 +84,64 @@ def add_achievement(
         status=AchievementStatus.PENDING
     )
     db.add(new_achievement)
+    stats.record_new_achievement(db, new_achievement.status, new_achievement.category)
     db.commit()
     db.refresh(new_achievement)
     return new_achievement
 
+def load_student_portfolio(db: Session, student_id: int = None, share_token: str = None, verified_only: bool = False):
+    """Load a student with its portfolio and achievements in a fixed number of queries.
+
+    The portfolio is joined onto the student row and achievements are fetched
+    with a single selectin query; when verified_only is set the status filter
+    is applied in SQL rather than in Python.
+    """
+    achievements = Student.achievements
+    if verified_only:
+        achievements = achievements.and_(Achievement.status == AchievementStatus.VERIFIED)
+
+    query = db.query(Student).options(selectinload(achievements)).execution_options(populate_existing=True)
+    if share_token is not None:
+        query = (
+            query.join(Student.portfolio)
+            .options(contains_eager(Student.portfolio))
+            .filter(Portfolio.share_token == share_token, Portfolio.is_public == True)  # noqa: E712
+        )
+    else:
+        query = query.options(joinedload(Student.portfolio)).filter(Student.id == student_id)
+    return query.first()
+
+def get_student(db: Session, current_user: Principal) -> Student:
+    """Load the caller's student profile using the id cached on the principal"""
+    student = load_student_portfolio(db, student_id=current_user.student_id)
+    if student is None:
+        raise HTTPException(status_code=404, detail="Student profile not found")
+    return student
+
+def portfolio_response(student: Student, email: str = None, private: bool = True):
+    """Build a PortfolioResponse payload; private fields are omitted for public views"""
+    portfolio = student.portfolio
+    data = {
+        "student_name": student.full_name,
+        "department": student.department,
+        "program": student.program,
+        "enrollment_year": student.enrollment_year,
+        "gpa": student.gpa,
+        "achievements": student.achievements,
+        "is_public": portfolio.is_public if portfolio else False,
+        "share_token": portfolio.share_token if portfolio else None
+    }
+    if private:
+        data.update({
+            "email": email,
+            "enrollment_no": student.enrollment_no,
+            "phone_number": student.phone_number,
+            "date_of_birth": student.date_of_birth,
+            "age": calculate_age(student.date_of_birth),
+            "bio": student.bio,
+        })
+    return data
+
 def calculate_age(dob):
     """Calculate age from date of birth"""
     if not dob:
@@ -44,41 +151,26 @@ def calculate_age(dob):
 
 @router.get("/me", response_model=PortfolioResponse)
 def get_my_portfolio(
-    current_user: User = Depends(get_current_user), 
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_user), 
+    db: Session = Depends(get_read_db)
 ):
     if current_user.role != UserRole.STUDENT:
         raise HTTPException(status_code=403, detail="Not a student")
     
-    student = current_user.student_profile
-    return {
-        "student_name": student.full_name,
-        "email": current_user.email,
-        "enrollment_no": student.enrollment_no,
-        "department": student.department,
-        "program": student.program,
-        "enrollment_year": student.enrollment_year,
-        "gpa": student.gpa,
-        "phone_number": student.phone_number,
-        "date_of_birth": student.date_of_birth,
-        "age": calculate_age(student.date_of_birth),
-        "bio": student.bio,
-        "achievements": student.achievements,
-        "is_public": student.portfolio.is_public if student.portfolio else False,
-        "share_token": student.portfolio.share_token if student.portfolio else None
-    }
+    student = get_student(db, current_user)
+    return portfolio_response(student, email=current_user.email)
 
 @router.put("/profile", response_model=PortfolioResponse)
 def update_profile(
     profile_data: ProfileUpdateRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Update student profile information"""
     if current_user.role != UserRole.STUDENT:
         raise HTTPException(status_code=403, detail="Not a student")
     
-    student = current_user.student_profile
+    student = get_student(db, current_user)
     
     # Update only provided fields
     if profile_data.phone_number is not None:
@@ -93,148 +185,293 @@ def update_profile(
         student.department = profile_data.department
     if profile_data.program is not None:
         student.program = profile_data.program
+    if profile_data.department is not None or profile_data.program is not None:
+        stats.sync_leaderboard_student(db, student.id, student.department, student.program)
     
     db.commit()
-    db.refresh(student)
-    
-    return {
-        "student_name": student.full_name,
-        "email": current_user.email,
-        "enrollment_no": student.enrollment_no,
-        "department": student.department,
-        "program": student.program,
-        "enrollment_year": student.enrollment_year,
-        "gpa": student.gpa,
-        "phone_number": student.phone_number,
-        "date_of_birth": student.date_of_birth,
-        "age": calculate_age(student.date_of_birth),
-        "bio": student.bio,
-        "achievements": student.achievements,
-        "is_public": student.portfolio.is_public if student.portfolio else False,
-        "share_token": student.portfolio.share_token if student.portfolio else None
-    }
+    invalidate_principal(current_user.email)
+
+    student = get_student(db, current_user)
+    if student.portfolio:
+        invalidate_public_portfolio(db, share_token=student.portfolio.share_token)
+    return portfolio_response(student, email=current_user.email)
 
 @router.get("/achievements/pending", response_model=List[AchievementResponse])
 def get_pending_achievements(
-    current_user: User = Depends(get_current_user), 
-    db: Session = Depends(get_db)
+    response: Response,
+    cursor: Optional[int] = None,
+    limit: int = Query(50, ge=1, le=200),
+    department: Optional[str] = None,
+    category: Optional[AchievementCategory] = None,
+    current_user: Principal = Depends(get_current_user), 
+    db: Session = Depends(get_read_db)
 ):
+    """Oldest-first pending queue, keyset-paginated on (created_at, id).
+
+    Pass the X-Next-Cursor response header back as `cursor` to fetch the next
+    page; the header is absent on the last page.
+    """
     if current_user.role != UserRole.FACULTY:
         raise HTTPException(status_code=403, detail="Only faculty can view pending achievements")
     
-    achievements = db.query(Achievement).filter(Achievement.status == AchievementStatus.PENDING).all()
+    query = db.query(Achievement).filter(Achievement.status == AchievementStatus.PENDING)
+    if department is not None:
+        query = query.join(Achievement.student).filter(Student.department == department)
+    if category is not None:
+        query = query.filter(Achievement.category == category)
+    if cursor is not None:
+        # An unknown anchor would make the comparison NULL and silently end the listing
+        if db.query(Achievement.id).filter(Achievement.id == cursor).first() is None:
+            raise HTTPException(status_code=400, detail="Unknown cursor")
+        # Compare against the stored row rather than a bound timestamp so the
+        # cursor is immune to datetime formatting differences between backends
+        anchor = db.query(Achievement.created_at).filter(Achievement.id == cursor).scalar_subquery()
+        query = query.filter(or_(
+            Achievement.created_at > anchor,
+            and_(Achievement.created_at == anchor, Achievement.id > cursor),
+        ))
+
+    achievements = query.order_by(Achievement.created_at, Achievement.id).limit(limit + 1).all()
+    if len(achievements) > limit:
+        achievements = achievements[:limit]
+        response.headers["X-Next-Cursor"] = str(achievements[-1].id)
     return achievements
 
+@router.get("/achievements/search", response_model=List[AchievementResponse])
+def search_achievements(
+    q: str = Query(..., min_length=1, max_length=200),
+    status: Optional[AchievementStatus] = None,
+    category: Optional[AchievementCategory] = None,
+    department: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    current_user: Principal = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
+):
+    """Ranked full-text search over achievement titles and descriptions"""
+    if current_user.role != UserRole.FACULTY:
+        raise HTTPException(status_code=403, detail="Only faculty can search achievements")
+    q = q.strip()
+    if not q:
+        raise HTTPException(status_code=422, detail="Search query must contain at least one term")
+
+    query = db.query(Achievement)
+    if status is not None:
+        query = query.filter(Achievement.status == status)
+    if category is not None:
+        query = query.filter(Achievement.category == category)
+    if department is not None:
+        query = query.join(Achievement.student).filter(Student.department == department)
+    query = search.apply_search(query, q, db.get_bind().dialect.name)
+    return query.limit(limit).all()
+
 @router.get("/analytics")
 def get_analytics(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
 ):
     """Get analytics data for faculty dashboard"""
     if current_user.role != UserRole.FACULTY:
         raise HTTPException(status_code=403, detail="Only faculty can view analytics")
-    
-    from models import AchievementCategory
-    from sqlalchemy import func
-    
-    # Total counts by status
-    total_achievements = db.query(Achievement).count()
-    verified_count = db.query(Achievement).filter(Achievement.status == AchievementStatus.VERIFIED).count()
-    pending_count = db.query(Achievement).filter(Achievement.status == AchievementStatus.PENDING).count()
-    
-    # Category breakdown
-    category_stats = db.query(
-        Achievement.category,
-        func.count(Achievement.id).label('count')
-    ).group_by(Achievement.category).all()
-    
-    category_breakdown = {cat: count for cat, count in category_stats}
-    
-    # Student count
-    total_students = db.query(Student).count()
-    
-    return {
-        "total_achievements": total_achievements,
-        "verified_count": verified_count,
-        "pending_count": pending_count,
-        "total_students": total_students,
-        "category_breakdown": category_breakdown
-    }
+
+    return stats.read_analytics(db)
+
+@router.get("/leaderboard", response_model=List[LeaderboardEntry])
+def get_leaderboard(
+    category: Optional[AchievementCategory] = None,
+    department: Optional[str] = None,
+    program: Optional[str] = None,
+    limit: int = Query(10, ge=1, le=100),
+    current_user: Principal = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
+):
+    """Top students by verified achievements, optionally per category, department or program"""
+    if current_user.role != UserRole.FACULTY:
+        raise HTTPException(status_code=403, detail="Only faculty can view leaderboards")
+
+    return stats.read_leaderboard(db, category=category, department=department, program=program, limit=limit)
+
+@router.get("/leaderboard/students/{student_id}", response_model=StudentRank)
+def get_student_rank(
+    student_id: int,
+    category: Optional[AchievementCategory] = None,
+    scope: Literal["all", "department", "program"] = "department",
+    current_user: Principal = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
+):
+    """Where a student stands on their department's (or program's, or the overall) leaderboard"""
+    if current_user.role != UserRole.FACULTY and current_user.student_id != student_id:
+        raise HTTPException(status_code=403, detail="Not allowed to view this student's rank")
+
+    student = db.query(Student).filter(Student.id == student_id).first()
+    if student is None:
+        raise HTTPException(status_code=404, detail="Student not found")
+    return stats.read_student_rank(db, student, category=category, scope=scope)
 
 @router.put("/achievements/{achievement_id}/verify")
 def verify_achievement(
     achievement_id: int, 
     status: AchievementStatus,
-    current_user: User = Depends(get_current_user), 
+    current_user: Principal = Depends(get_current_user), 
     db: Session = Depends(get_db)
 ):
     if current_user.role != UserRole.FACULTY:
         raise HTTPException(status_code=403, detail="Only faculty can verify achievements")
     
-    achievement = db.query(Achievement).filter(Achievement.id == achievement_id).first()
-    if not achievement:
-        raise HTTPException(status_code=404, detail="Achievement not found")
-    
-    achievement.status = status
-    achievement.verified_by = current_user.faculty_profile.id
+    # Guarded write: the counters are only adjusted by the transaction whose
+    # UPDATE actually moved the row out of the status it read. A concurrent
+    # decision makes the guard miss, and the row is simply re-read.
+    for _ in range(VERIFY_ATTEMPTS):
+        achievement = db.query(
+            Achievement.id, Achievement.student_id, Achievement.category, Achievement.status
+        ).filter(Achievement.id == achievement_id).first()
+        if not achievement:
+            raise HTTPException(status_code=404, detail="Achievement not found")
+
+        result = db.execute(
+            update(Achievement)
+            .where(Achievement.id == achievement_id, Achievement.status == achievement.status)
+            .values(status=status, verified_by=current_user.faculty_id)
+            .returning(Achievement.id)
+            .execution_options(synchronize_session=False)
+        )
+        if result.first() is not None:
+            break
+        db.rollback()
+    else:
+        raise HTTPException(status_code=409, detail="Achievement is being updated concurrently, try again")
+
+    student_id = achievement.student_id
+    stats.record_status_change(db, achievement.category, achievement.status, status)
+    stats.record_verification(db, student_id, achievement.category, achievement.status, status)
     db.commit()
+    invalidate_public_portfolio(db, student_id=student_id)
+
+@router.post("/achievements/verify", response_model=BulkVerifyResponse)
+def bulk_verify_achievements(
+    request: BulkVerifyRequest,
+    current_user: Principal = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Decide many pending achievements in a single transaction.
+
+    Only PENDING achievements are updated; every item gets an outcome so the
+    client can tell missing ids and already-decided items apart.
+    """
+    if current_user.role != UserRole.FACULTY:
+        raise HTTPException(status_code=403, detail="Only faculty can verify achievements")
+
+    outcomes = {}
+    decisions = {}
+    for item in request.items:
+        if item.id in outcomes or item.id in decisions:
+            outcomes[item.id] = "duplicate"
+            decisions.pop(item.id, None)
+        elif item.status == AchievementStatus.PENDING:
+            outcomes[item.id] = "invalid_status"
+        else:
+            decisions[item.id] = item.status
+
+    rows = db.query(Achievement.id, Achievement.status, Achievement.category, Achievement.student_id).filter(
+        Achievement.id.in_(list(decisions))
+    ).all()
+    found = {row.id: row for row in rows}
+
+    by_status = {}
+    for achievement_id, target in decisions.items():
+        row = found.get(achievement_id)
+        if row is None:
+            outcomes[achievement_id] = "not_found"
+        elif row.status != AchievementStatus.PENDING:
+            outcomes[achievement_id] = "already_decided"
+        else:
+            by_status.setdefault(target, []).append(achievement_id)
+
+    # One guarded UPDATE per target status; RETURNING tells us which rows were
+    # still pending when the write happened
+    updated = set()
+    for target, ids in by_status.items():
+        result = db.execute(
+            update(Achievement)
+            .where(Achievement.id.in_(ids), Achievement.status == AchievementStatus.PENDING)
+            .values(status=target, verified_by=current_user.faculty_id)
+            .returning(Achievement.id)
+            .execution_options(synchronize_session=False)
+        )
+        updated.update(result.scalars().all())
+
+    deltas = Counter()
+    leaderboard_deltas = Counter()
+    for target, ids in by_status.items():
+        for achievement_id in ids:
+            if achievement_id in updated:
+                row = found[achievement_id]
+                deltas[(AchievementStatus.PENDING, row.category)] -= 1
+                deltas[(target, row.category)] += 1
+                leaderboard_deltas[(row.student_id, row.category)] += stats.verified_delta(AchievementStatus.PENDING, target)
+                outcomes[achievement_id] = "updated"
+            else:
+                outcomes[achievement_id] = "already_decided"
+    stats.apply_stat_deltas(db, deltas)
+    stats.apply_leaderboard_deltas(db, leaderboard_deltas)
+    db.commit()
+
+    invalidate_public_portfolios(db, {found[i].student_id for i in updated})
+
+    return {
+        "updated": len(updated),
+        "results": [
+            {"id": item.id, "outcome": outcomes[item.id], "status": item.status if outcomes[item.id] == "updated" else None}
+            for item in request.items
+        ],
+    }
+
 @router.post("/share", response_model=PortfolioResponse)
 def share_portfolio(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     if current_user.role != UserRole.STUDENT:
         raise HTTPException(status_code=403, detail="Only students can share portfolios")
     
-    student = current_user.student_profile
+    student = get_student(db, current_user)
     if not student.portfolio:
         # Create portfolio if not exists (though it should ideally exist on registration)
-        from models import Portfolio
-        new_portfolio = Portfolio(student_id=student.id, is_public=True, share_token=str(uuid.uuid4()))
-        db.add(new_portfolio)
-        db.commit()
-        db.refresh(new_portfolio)
+        db.add(Portfolio(student_id=student.id, is_public=True, share_token=str(uuid.uuid4())))
     elif not student.portfolio.share_token:
         student.portfolio.share_token = str(uuid.uuid4())
         student.portfolio.is_public = True
-        db.commit()
     else:
         student.portfolio.is_public = True
-        db.commit()
-    
-    return {
-        "student_name": student.full_name,
-        "department": student.department,
-        "program": student.program,
-        "enrollment_year": student.enrollment_year,
-        "gpa": student.gpa,
-        "achievements": student.achievements,
-        "is_public": True,
-        "share_token": student.portfolio.share_token
-    }
+    db.commit()
+
+    student = get_student(db, current_user)
+    invalidate_public_portfolio(db, share_token=student.portfolio.share_token)
+    return portfolio_response(student, private=False)
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Check an If-None-Match header against a strong ETag"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or any(tag.removeprefix("W/") == etag for tag in candidates)
 
 @router.get("/public/{share_token}", response_model=PortfolioResponse)
 def get_public_portfolio(
     share_token: str,
-    db: Session = Depends(get_db)
+    request: Request
 ):
-    from models import Portfolio
-    portfolio = db.query(Portfolio).filter(Portfolio.share_token == share_token).first()
-    
-    if not portfolio or not portfolio.is_public:
-        raise HTTPException(status_code=404, detail="Portfolio not found or private")
-    
-    student = portfolio.student
-    # Filter only verified achievements
-    verified_achievements = [a for a in student.achievements if a.status == AchievementStatus.VERIFIED]
-    
-    return {
-        "student_name": student.full_name,
-        "department": student.department,
-        "program": student.program,
-        "enrollment_year": student.enrollment_year,
-        "gpa": student.gpa,
-        "achievements": verified_achievements,
-        "is_public": True,
-        "share_token": share_token
+    # No session dependency: cache hits and 304s never touch the database
+    cached = public_portfolio_cache.get(share_token)
+    if cached is None:
+        cached = render_public_portfolio(share_token)
+        if cached is None:
+            raise HTTPException(status_code=404, detail="Portfolio not found or private")
+        public_portfolio_cache.set(share_token, cached, PUBLIC_PORTFOLIO_CACHE_TTL)
+
+    headers = {
+        "ETag": cached["etag"],
+        "Cache-Control": f"public, max-age={PUBLIC_PORTFOLIO_MAX_AGE}",
     }
+    if etag_matches(request.headers.get("if-none-match"), cached["etag"]):
+        return Response(status_code=304, headers=headers)
+    return Response(content=cached["body"], media_type="application/json", headers=headers)
@@ -0,0 +1,175 @@
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import insert, literal, select, union_all
+from sqlalchemy.exc import IntegrityError
+from typing import Optional
+from database import SessionLocal
+from models import User, Student, UserRole
+from schemas import RosterEntry, Principal
+from auth import get_current_user, hash_passwords
+import csv
+import io
+import json
+import os
+
+router = APIRouter(
+    prefix="/api/roster",
+    tags=["roster"]
+)
+
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "1000"))
+MAX_REPORTED_ERRORS = 100
+
+def detect_format(upload: UploadFile, requested: Optional[str]) -> str:
+    if requested:
+        return requested
+    name = (upload.filename or "").lower()
+    content_type = (upload.content_type or "").lower()
+    if name.endswith((".ndjson", ".jsonl")) or "ndjson" in content_type or "jsonl" in content_type:
+        return "ndjson"
+    return "csv"
+
+def iter_records(stream, fmt: str):
+    """Yield (line_no, dict) pairs without reading the whole roster into memory"""
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    if fmt == "csv":
+        reader = csv.DictReader(text)
+        for record in reader:
+            yield reader.line_num, {k: (v.strip() or None) if isinstance(v, str) else v for k, v in record.items() if k}
+    else:
+        for line_no, line in enumerate(text, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield line_no, json.loads(line)
+            except json.JSONDecodeError as e:
+                yield line_no, e
+
+def iter_chunks(records, size: int):
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def find_existing(db, emails, enrollment_nos):
+    """One round trip per chunk: which emails / enrollment numbers are taken"""
+    stmt = union_all(
+        select(literal("email").label("kind"), User.email.label("value")).where(User.email.in_(emails)),
+        select(literal("enrollment_no").label("kind"), Student.enrollment_no.label("value")).where(
+            Student.enrollment_no.in_(enrollment_nos)
+        ),
+    )
+    taken = {"email": set(), "enrollment_no": set()}
+    for kind, value in db.execute(stmt):
+        taken[kind].add(value)
+    return taken
+
+def insert_students(db, rows):
+    """Insert (RosterEntry, password_hash) pairs as users plus students"""
+    user_ids = dict(db.execute(
+        insert(User).returning(User.email, User.id),
+        [{"email": e.email, "hashed_password": h, "role": UserRole.STUDENT.value} for e, h in rows],
+    ).all())
+    db.execute(insert(Student), [
+        {
+            "user_id": user_ids[e.email],
+            "enrollment_no": e.enrollment_no,
+            "full_name": e.full_name,
+            "department": e.department,
+            "program": e.program,
+            "enrollment_year": e.enrollment_year,
+        }
+        for e, _ in rows
+    ])
+
+def import_roster(upload: UploadFile, fmt: str):
+    """Import students chunk by chunk, yielding an NDJSON progress line per chunk"""
+    totals = {"processed": 0, "created": 0, "duplicates": 0, "errors": 0}
+    errors = []
+    seen_emails, seen_enrollments = set(), set()
+
+    def reject(line_no, reason):
+        totals["errors"] += 1
+        if len(errors) < MAX_REPORTED_ERRORS:
+            errors.append({"line": line_no, "error": reason})
+
+    db = SessionLocal()
+    try:
+        for chunk_no, chunk in enumerate(iter_chunks(iter_records(upload.file, fmt), IMPORT_CHUNK_SIZE), start=1):
+            entries = []
+            for line_no, record in chunk:
+                totals["processed"] += 1
+                if isinstance(record, json.JSONDecodeError):
+                    reject(line_no, f"invalid JSON: {record}")
+                    continue
+                if not isinstance(record, dict):
+                    reject(line_no, "record must be an object")
+                    continue
+                try:
+                    entries.append((line_no, RosterEntry(**record)))
+                except ValidationError as e:
+                    error = e.errors()[0]
+                    reject(line_no, f"{'.'.join(map(str, error['loc']))}: {error['msg']}")
+
+            taken = find_existing(db, [e.email for _, e in entries], [e.enrollment_no for _, e in entries])
+            fresh = []
+            for line_no, entry in entries:
+                if (entry.email in taken["email"] or entry.email in seen_emails
+                        or entry.enrollment_no in taken["enrollment_no"] or entry.enrollment_no in seen_enrollments):
+                    totals["duplicates"] += 1
+                    continue
+                seen_emails.add(entry.email)
+                seen_enrollments.add(entry.enrollment_no)
+                fresh.append(entry)
+
+            if fresh:
+                rows = list(zip(fresh, hash_passwords(entry.password for entry in fresh)))
+                try:
+                    insert_students(db, rows)
+                    db.commit()
+                    totals["created"] += len(rows)
+                except IntegrityError:
+                    # Someone registered or imported one of these between
+                    # find_existing and the insert; redo the chunk row by row
+                    # so only the conflicting rows are skipped
+                    db.rollback()
+                    for row in rows:
+                        try:
+                            insert_students(db, [row])
+                            db.commit()
+                            totals["created"] += 1
+                        except IntegrityError:
+                            db.rollback()
+                            totals["duplicates"] += 1
+
+            yield json.dumps({"chunk": chunk_no, **totals}) + "\n"
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+        upload.file.close()
+
+    yield json.dumps({"done": True, **totals, "error_samples": errors}) + "\n"
+
+@router.post("/import")
+def import_students(
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, pattern="^(csv|ndjson)$"),
+    current_user: Principal = Depends(get_current_user),
+):
+    """Bulk-create student accounts from a CSV or NDJSON roster.
+
+    Columns: email, password, full_name, enrollment_no and optionally
+    department, program, enrollment_year. Progress is streamed back as one
+    NDJSON line per chunk followed by a final summary line.
+    """
+    if current_user.role not in (UserRole.FACULTY, UserRole.ADMIN):
+        raise HTTPException(status_code=403, detail="Only faculty or admins can import students")
+
+    return StreamingResponse(import_roster(file, detect_format(file, format)), media_type="application/x-ndjson")
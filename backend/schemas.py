@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 from typing import Optional, List
 from datetime import datetime, date
 from models import UserRole, AchievementStatus, AchievementCategory
@@ -10,6 +10,14 @@ class Token(BaseModel):
 class TokenData(BaseModel):
     email: Optional[str] = None
 
+class Principal(BaseModel):
+    """Authenticated caller as cached by auth.get_current_user."""
+    id: int
+    email: str
+    role: UserRole
+    student_id: Optional[int] = None
+    faculty_id: Optional[int] = None
+
 class UserBase(BaseModel):
     email: EmailStr
 
@@ -25,6 +33,15 @@ class UserCreate(UserBase):
     # Faculty fields
     faculty_department: Optional[str] = None
 
+class RosterEntry(UserBase):
+    """One student row of a bulk import roster (CSV or NDJSON)"""
+    password: str = Field(..., min_length=1)
+    full_name: str = Field(..., min_length=1)
+    enrollment_no: str = Field(..., min_length=1)
+    department: Optional[str] = None
+    program: Optional[str] = None
+    enrollment_year: Optional[int] = None
+
 class UserResponse(UserBase):
     id: int
     role: UserRole
@@ -46,10 +63,45 @@ class AchievementResponse(AchievementBase):
     id: int
     status: AchievementStatus
     created_at: datetime
+    evidence_url: Optional[str] = None
     
     class Config:
         from_attributes = True
 
+class VerificationDecision(BaseModel):
+    id: int
+    status: AchievementStatus
+
+class BulkVerifyRequest(BaseModel):
+    items: List[VerificationDecision] = Field(..., min_length=1, max_length=500)
+
+class VerificationOutcome(BaseModel):
+    id: int
+    outcome: str  # updated | not_found | already_decided | duplicate | invalid_status
+    status: Optional[AchievementStatus] = None
+
+class BulkVerifyResponse(BaseModel):
+    updated: int
+    results: List[VerificationOutcome]
+
+class LeaderboardEntry(BaseModel):
+    rank: int
+    student_id: int
+    student_name: Optional[str] = None
+    department: Optional[str] = None
+    program: Optional[str] = None
+    verified_count: int
+
+class StudentRank(BaseModel):
+    student_id: int
+    student_name: Optional[str] = None
+    department: Optional[str] = None
+    program: Optional[str] = None
+    category: str  # achievement category, or ALL for the overall board
+    scope: str  # all | department | program
+    verified_count: int
+    rank: Optional[int] = None  # None until the student has a verified achievement
+
 class PortfolioResponse(BaseModel):
     student_name: str
     email: Optional[str] = None
@@ -0,0 +1,92 @@
+"""Full-text search over achievement titles and descriptions.
+
+SQLite uses an external-content FTS5 table kept in sync by triggers;
+Postgres uses a GIN index over a tsvector expression, which the planner
+maintains on every insert/update. Other backends fall back to LIKE.
+"""
+from sqlalchemy import column, func, literal_column, or_, table, text
+from sqlalchemy.orm import Query
+from models import Achievement
+
+SQLITE_FTS_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS achievements_fts USING fts5(
+        title, description, content='achievements', content_rowid='id', tokenize='porter unicode61'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS achievements_fts_ai AFTER INSERT ON achievements BEGIN
+        INSERT INTO achievements_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS achievements_fts_ad AFTER DELETE ON achievements BEGIN
+        INSERT INTO achievements_fts(achievements_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS achievements_fts_au AFTER UPDATE OF title, description ON achievements BEGIN
+        INSERT INTO achievements_fts(achievements_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO achievements_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+]
+SQLITE_FTS_DROP = [
+    "DROP TRIGGER IF EXISTS achievements_fts_au",
+    "DROP TRIGGER IF EXISTS achievements_fts_ad",
+    "DROP TRIGGER IF EXISTS achievements_fts_ai",
+    "DROP TABLE IF EXISTS achievements_fts",
+]
+
+# Must stay byte-for-byte identical to the indexed expression below
+PG_TSVECTOR = "to_tsvector('english', coalesce(achievements.title, '') || ' ' || coalesce(achievements.description, ''))"
+PG_FTS_DDL = [
+    "CREATE INDEX IF NOT EXISTS ix_achievements_search ON achievements USING GIN ("
+    "(to_tsvector('english', coalesce(title, '') || ' ' || coalesce(description, ''))))",
+]
+PG_FTS_DROP = ["DROP INDEX IF EXISTS ix_achievements_search"]
+
+achievements_fts = table("achievements_fts", column("rowid"), column("rank"))
+
+
+def create_search_index(connection):
+    """Idempotently create the search index for the connection's dialect"""
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        exists = connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'achievements_fts'")
+        ).first()
+        for ddl in SQLITE_FTS_DDL:
+            connection.execute(text(ddl))
+        if not exists:
+            # Weight title matches above description matches, then index
+            # rows that predate the FTS table
+            connection.execute(text("INSERT INTO achievements_fts(achievements_fts, rank) VALUES ('rank', 'bm25(10.0, 1.0)')"))
+            connection.execute(text("INSERT INTO achievements_fts(achievements_fts) VALUES ('rebuild')"))
+    elif dialect == "postgresql":
+        for ddl in PG_FTS_DDL:
+            connection.execute(text(ddl))
+
+
+def drop_search_index(connection):
+    dialect = connection.dialect.name
+    for ddl in SQLITE_FTS_DROP if dialect == "sqlite" else PG_FTS_DROP if dialect == "postgresql" else []:
+        connection.execute(text(ddl))
+
+
+def _fts5_query(q: str) -> str:
+    """Turn free text into a safe FTS5 query: every term quoted, last one prefix-matched"""
+    terms = ['"%s"' % term.replace('"', '""') for term in q.split()]
+    if terms:
+        terms[-1] += "*"
+    return " ".join(terms)
+
+
+def apply_search(query: Query, q: str, dialect: str) -> Query:
+    """Restrict an Achievement query to matches of `q`, best matches first"""
+    if dialect == "sqlite":
+        return (
+            query.join(achievements_fts, achievements_fts.c.rowid == Achievement.id)
+            .filter(literal_column("achievements_fts").op("MATCH")(_fts5_query(q)))
+            .order_by(achievements_fts.c.rank)
+        )
+    if dialect == "postgresql":
+        vector = literal_column(PG_TSVECTOR)
+        tsquery = func.websearch_to_tsquery("english", q)
+        return query.filter(vector.op("@@")(tsquery)).order_by(func.ts_rank(vector, tsquery).desc())
+    pattern = f"%{q}%"
+    return query.filter(or_(Achievement.title.ilike(pattern), Achievement.description.ilike(pattern)))
@@ -0,0 +1,317 @@
+"""Summary counters backing the faculty analytics dashboard and leaderboards.
+
+Usage:
+    python stats.py rebuild   # recompute achievement_stats and student_verified_counts
+    python stats.py check     # compare counters against a live aggregate
+"""
+import sys
+from collections import Counter
+from typing import Dict, Tuple
+from sqlalchemy import and_, case, delete, func, insert, literal, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from models import Achievement, AchievementStat, AchievementStatus, Student, StudentVerifiedCount, ALL_CATEGORIES
+
+StatKey = Tuple[str, str]
+LeaderboardKey = Tuple[int, str]
+
+def _value(v) -> str:
+    return v.value if hasattr(v, "value") else v
+
+def _upsert_insert(db: Session):
+    """INSERT construct supporting ON CONFLICT for the session's dialect"""
+    return {"postgresql": postgresql.insert, "sqlite": sqlite.insert}.get(db.get_bind().dialect.name)
+
+def apply_stat_deltas(db: Session, deltas: Dict[StatKey, int]):
+    """Apply (status, category) -> delta changes inside the caller's transaction.
+
+    Counters are upserted so two transactions creating the same row at once
+    both succeed instead of one failing on the primary key.
+    """
+    dialect_insert = _upsert_insert(db)
+    for (status, category), delta in deltas.items():
+        if not delta:
+            continue
+        status, category = _value(status), _value(category)
+        if dialect_insert is not None:
+            stmt = dialect_insert(AchievementStat).values(status=status, category=category, count=delta)
+            db.execute(stmt.on_conflict_do_update(
+                index_elements=[AchievementStat.status, AchievementStat.category],
+                set_={"count": AchievementStat.count + stmt.excluded.count},
+            ))
+            continue
+        result = db.execute(
+            update(AchievementStat)
+            .where(AchievementStat.status == status, AchievementStat.category == category)
+            .values(count=AchievementStat.count + delta)
+        )
+        if result.rowcount == 0:
+            db.execute(insert(AchievementStat).values(status=status, category=category, count=delta))
+
+def record_new_achievement(db: Session, status, category):
+    apply_stat_deltas(db, {(status, category): 1})
+
+def record_status_change(db: Session, category, old_status, new_status):
+    if _value(old_status) == _value(new_status):
+        return
+    apply_stat_deltas(db, Counter({(old_status, category): -1, (new_status, category): 1}))
+
+def rebuild_achievement_stats(db: Session):
+    """Recompute every counter from the achievements table in one transaction.
+
+    The summary table is cleared first so that, on SQLite, the write lock is
+    held before the aggregate is read; on Postgres the table is locked
+    explicitly so concurrent increments queue behind the rebuild.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        db.connection().exec_driver_sql("LOCK TABLE achievement_stats IN EXCLUSIVE MODE")
+    db.execute(delete(AchievementStat))
+    db.execute(
+        insert(AchievementStat).from_select(
+            ["status", "category", "count"],
+            select(Achievement.status, Achievement.category, func.count(Achievement.id))
+            .group_by(Achievement.status, Achievement.category),
+        )
+    )
+    db.commit()
+
+def ensure_achievement_stats(db: Session):
+    """Seed the counters on first start of a database that predates them"""
+    if db.query(AchievementStat).first() is None and db.query(Achievement.id).first() is not None:
+        rebuild_achievement_stats(db)
+
+def read_analytics(db: Session) -> dict:
+    """Dashboard numbers from the summary table: O(statuses x categories)"""
+    rows = db.query(AchievementStat.status, AchievementStat.category, AchievementStat.count).all()
+    total_students = db.query(func.count(Student.id)).scalar()
+    return _summarize(rows, total_students)
+
+def live_analytics(db: Session) -> dict:
+    """Same numbers straight from achievements in a single aggregate query"""
+    rows = db.query(
+        Achievement.category,
+        func.count(Achievement.id),
+        func.sum(case((Achievement.status == AchievementStatus.VERIFIED, 1), else_=0)),
+        func.sum(case((Achievement.status == AchievementStatus.PENDING, 1), else_=0)),
+        select(func.count(Student.id)).scalar_subquery(),
+    ).group_by(Achievement.category).all()
+    return {
+        "total_achievements": sum(row[1] for row in rows),
+        "verified_count": sum(row[2] for row in rows),
+        "pending_count": sum(row[3] for row in rows),
+        "total_students": rows[0][4] if rows else db.query(func.count(Student.id)).scalar(),
+        "category_breakdown": {row[0]: row[1] for row in rows},
+    }
+
+def _summarize(rows, total_students) -> dict:
+    category_breakdown = Counter()
+    by_status = Counter()
+    for status, category, count in rows:
+        if not count:
+            continue
+        by_status[status] += count
+        category_breakdown[category] += count
+    return {
+        "total_achievements": sum(by_status.values()),
+        "verified_count": by_status[AchievementStatus.VERIFIED.value],
+        "pending_count": by_status[AchievementStatus.PENDING.value],
+        "total_students": total_students,
+        "category_breakdown": dict(category_breakdown),
+    }
+
+def apply_leaderboard_deltas(db: Session, deltas: Dict[LeaderboardKey, int]):
+    """Apply (student_id, category) -> verified count changes inside the
+    caller's transaction; each change is mirrored onto the student's total.
+
+    Rows are upserted: the shared ALL row makes two transactions creating
+    the same row at once likely, and a plain INSERT would fail one of them.
+    """
+    dialect_insert = _upsert_insert(db)
+    expanded = Counter()
+    for (student_id, category), delta in deltas.items():
+        expanded[(student_id, _value(category))] += delta
+        expanded[(student_id, ALL_CATEGORIES)] += delta
+    columns = ["student_id", "category", "department", "program", "verified_count"]
+    for (student_id, category), delta in expanded.items():
+        if not delta:
+            continue
+        # The WHERE clause also keeps SQLite's parser from reading ON CONFLICT as a join constraint
+        source = select(Student.id, literal(category), Student.department, Student.program, literal(delta)).where(
+            Student.id == student_id
+        )
+        if dialect_insert is not None:
+            stmt = dialect_insert(StudentVerifiedCount).from_select(columns, source)
+            db.execute(stmt.on_conflict_do_update(
+                index_elements=[StudentVerifiedCount.student_id, StudentVerifiedCount.category],
+                set_={"verified_count": StudentVerifiedCount.verified_count + stmt.excluded.verified_count},
+            ))
+            continue
+        result = db.execute(
+            update(StudentVerifiedCount)
+            .where(StudentVerifiedCount.student_id == student_id, StudentVerifiedCount.category == category)
+            .values(verified_count=StudentVerifiedCount.verified_count + delta)
+        )
+        if result.rowcount == 0:
+            db.execute(insert(StudentVerifiedCount).from_select(columns, source))
+
+def verified_delta(old_status, new_status) -> int:
+    verified = AchievementStatus.VERIFIED.value
+    return int(_value(new_status) == verified) - int(_value(old_status) == verified)
+
+def record_verification(db: Session, student_id: int, category, old_status, new_status):
+    delta = verified_delta(old_status, new_status)
+    if delta:
+        apply_leaderboard_deltas(db, {(student_id, category): delta})
+
+def sync_leaderboard_student(db: Session, student_id: int, department, program):
+    """Carry a student's department/program change over to their leaderboard rows"""
+    db.execute(
+        update(StudentVerifiedCount)
+        .where(StudentVerifiedCount.student_id == student_id)
+        .values(department=department, program=program)
+    )
+
+def rebuild_leaderboard(db: Session):
+    """Recompute every student's verified counts from achievements"""
+    if db.get_bind().dialect.name == "postgresql":
+        db.connection().exec_driver_sql("LOCK TABLE student_verified_counts IN EXCLUSIVE MODE")
+    db.execute(delete(StudentVerifiedCount))
+    columns = ["student_id", "category", "department", "program", "verified_count"]
+    verified = (
+        select(Achievement.student_id, Achievement.category, func.count(Achievement.id).label("verified_count"))
+        .where(Achievement.status == AchievementStatus.VERIFIED)
+        .group_by(Achievement.student_id, Achievement.category)
+        .subquery()
+    )
+    db.execute(insert(StudentVerifiedCount).from_select(columns, select(
+        verified.c.student_id, verified.c.category, Student.department, Student.program, verified.c.verified_count,
+    ).join(Student, Student.id == verified.c.student_id)))
+    db.execute(insert(StudentVerifiedCount).from_select(columns, select(
+        verified.c.student_id, literal(ALL_CATEGORIES), Student.department, Student.program,
+        func.sum(verified.c.verified_count),
+    ).join(Student, Student.id == verified.c.student_id).group_by(
+        verified.c.student_id, Student.department, Student.program,
+    )))
+    db.commit()
+
+def ensure_leaderboard(db: Session):
+    """Seed the leaderboard on first start of a database that predates it"""
+    if (db.query(StudentVerifiedCount.student_id).first() is None
+            and db.query(Achievement.id).filter(Achievement.status == AchievementStatus.VERIFIED).first() is not None):
+        rebuild_leaderboard(db)
+
+def _leaderboard_filter(category, department=None, program=None) -> list:
+    criteria = [StudentVerifiedCount.category == (_value(category) if category else ALL_CATEGORIES)]
+    if department is not None:
+        criteria.append(StudentVerifiedCount.department == department)
+    if program is not None:
+        criteria.append(StudentVerifiedCount.program == program)
+    return criteria
+
+def read_leaderboard(db: Session, category=None, department: str = None, program: str = None, limit: int = 10) -> list:
+    """Top students by verified achievements: a range scan over one index.
+
+    Ties are broken by student id so ranks are stable between requests.
+    """
+    rows = (
+        db.query(
+            StudentVerifiedCount.student_id, Student.full_name, StudentVerifiedCount.department,
+            StudentVerifiedCount.program, StudentVerifiedCount.verified_count,
+        )
+        .join(Student, Student.id == StudentVerifiedCount.student_id)
+        .filter(*_leaderboard_filter(category, department, program), StudentVerifiedCount.verified_count > 0)
+        .order_by(StudentVerifiedCount.verified_count.desc(), StudentVerifiedCount.student_id)
+        .limit(limit)
+        .all()
+    )
+    return [
+        {
+            "rank": rank,
+            "student_id": row.student_id,
+            "student_name": row.full_name,
+            "department": row.department,
+            "program": row.program,
+            "verified_count": row.verified_count,
+        }
+        for rank, row in enumerate(rows, start=1)
+    ]
+
+def read_student_rank(db: Session, student: Student, category=None, scope: str = "all") -> dict:
+    """A student's position on the overall, department or program leaderboard.
+
+    Counts the rows ahead of the student on the leaderboard index; students
+    without verified achievements are unranked.
+    """
+    category = _value(category) if category else ALL_CATEGORIES
+    criteria = [StudentVerifiedCount.category == category]
+    if scope == "department":
+        criteria.append(StudentVerifiedCount.department == student.department)
+    elif scope == "program":
+        criteria.append(StudentVerifiedCount.program == student.program)
+
+    verified_count = db.query(StudentVerifiedCount.verified_count).filter(
+        StudentVerifiedCount.student_id == student.id, StudentVerifiedCount.category == category
+    ).scalar() or 0
+    rank = None
+    if verified_count > 0:
+        ahead = db.query(func.count()).select_from(StudentVerifiedCount).filter(
+            *criteria,
+            or_(
+                StudentVerifiedCount.verified_count > verified_count,
+                and_(StudentVerifiedCount.verified_count == verified_count, StudentVerifiedCount.student_id < student.id),
+            ),
+        ).scalar()
+        rank = ahead + 1
+    return {
+        "student_id": student.id,
+        "student_name": student.full_name,
+        "department": student.department,
+        "program": student.program,
+        "category": category,
+        "scope": scope,
+        "verified_count": verified_count,
+        "rank": rank,
+    }
+
+def live_leaderboard(db: Session) -> dict:
+    """(student_id, category) -> verified count straight from achievements"""
+    rows = db.query(Achievement.student_id, Achievement.category, func.count(Achievement.id)).filter(
+        Achievement.status == AchievementStatus.VERIFIED
+    ).group_by(Achievement.student_id, Achievement.category).all()
+    counts = Counter()
+    for student_id, category, count in rows:
+        counts[(student_id, category)] += count
+        counts[(student_id, ALL_CATEGORIES)] += count
+    return dict(counts)
+
+def stored_leaderboard(db: Session) -> dict:
+    rows = db.query(
+        StudentVerifiedCount.student_id, StudentVerifiedCount.category, StudentVerifiedCount.verified_count
+    ).filter(StudentVerifiedCount.verified_count != 0).all()
+    return {(student_id, category): count for student_id, category, count in rows}
+
+if __name__ == "__main__":
+    from database import SessionLocal, engine, Base
+
+    command = sys.argv[1] if len(sys.argv) > 1 else "rebuild"
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        if command == "rebuild":
+            rebuild_achievement_stats(db)
+            print("achievement_stats rebuilt:", read_analytics(db))
+            rebuild_leaderboard(db)
+            print("student_verified_counts rebuilt:", len(stored_leaderboard(db)), "rows")
+        elif command == "check":
+            counters, live = read_analytics(db), live_analytics(db)
+            print("counters:", counters)
+            print("live:    ", live)
+            stored, expected = stored_leaderboard(db), live_leaderboard(db)
+            drift = {key for key in stored.keys() | expected.keys() if stored.get(key) != expected.get(key)}
+            print("leaderboard rows:", len(stored), "drifted:", sorted(drift)[:20])
+            sys.exit(0 if counters == live and not drift else 1)
+        else:
+            print(__doc__)
+            sys.exit(2)
+    finally:
+        db.close()
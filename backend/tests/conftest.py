@@ -0,0 +1,8 @@
+import os
+import sys
+import tempfile
+
+# The backend modules read DATABASE_URL at import time, so point them at a
+# throwaway SQLite file before anything imports `database`
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "test.db")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,116 @@
+"""The incrementally maintained counters must match a recount from achievements.
+
+achievement_stats (faculty analytics) and student_verified_counts
+(leaderboards) are both adjusted by deltas in the write path; any status
+transition that skips or double-applies a delta shows up as a difference
+from the live aggregate.
+"""
+import itertools
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+import stats
+from database import SessionLocal
+
+_accounts = itertools.count()
+
+
+@pytest.fixture(scope="module")
+def client():
+    return TestClient(main.app)
+
+
+def login(client, role, **profile):
+    email = f"counters-{role}-{next(_accounts)}@eduzo.example.com"
+    response = client.post("/api/auth/register", json={
+        "email": email, "password": "pw123456", "full_name": "Test User", "role": role, **profile,
+    })
+    assert response.status_code == 200, response.text
+    token = client.post("/api/auth/login", data={"username": email, "password": "pw123456"}).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def add_achievements(client, student, categories):
+    ids = []
+    for i, category in enumerate(categories):
+        response = client.post("/api/portfolio/achievements", json={
+            "title": f"Award {i}", "description": "d", "category": category,
+        }, headers=student)
+        assert response.status_code == 200, response.text
+        ids.append(response.json()["id"])
+    return ids
+
+
+def verify(client, faculty, achievement_id, status):
+    response = client.put(f"/api/portfolio/achievements/{achievement_id}/verify?status={status}", headers=faculty)
+    assert response.status_code == 200, response.text
+
+
+def assert_counters_match():
+    db = SessionLocal()
+    try:
+        assert stats.read_analytics(db) == stats.live_analytics(db)
+        assert stats.stored_leaderboard(db) == stats.live_leaderboard(db)
+    finally:
+        db.close()
+
+
+def test_single_verification_keeps_counters_in_sync(client):
+    faculty = login(client, "faculty", department="CS")
+    student = login(client, "student", enrollment_no=f"CNT-{next(_accounts)}", department="CS", program="B.Tech")
+    academic, sports, technical = add_achievements(client, student, ["ACADEMIC", "SPORTS", "TECHNICAL"])
+    assert_counters_match()
+
+    for achievement_id, status in [
+        (academic, "VERIFIED"),
+        (academic, "VERIFIED"),  # same status again: no delta
+        (sports, "REJECTED"),
+        (sports, "REJECTED"),
+        (academic, "REJECTED"),  # verified -> rejected takes the leaderboard count back
+        (sports, "VERIFIED"),
+        (technical, "VERIFIED"),
+        (technical, "PENDING"),
+    ]:
+        verify(client, faculty, achievement_id, status)
+        assert_counters_match()
+
+    add_achievements(client, student, ["SPORTS"])
+    assert_counters_match()
+
+
+def test_bulk_verification_keeps_counters_in_sync(client):
+    faculty = login(client, "faculty", department="EE")
+    students = [
+        login(client, "student", enrollment_no=f"CNT-{next(_accounts)}", department="EE", program=program)
+        for program in ("B.Tech", "M.Sc")
+    ]
+    ids = [
+        achievement_id
+        for student in students
+        for achievement_id in add_achievements(client, student, ["ACADEMIC", "RESEARCH", "RESEARCH", "OTHER"])
+    ]
+    verify(client, faculty, ids[0], "VERIFIED")
+    assert_counters_match()
+
+    response = client.post("/api/portfolio/achievements/verify", json={"items": [
+        {"id": ids[0], "status": "REJECTED"},  # already decided
+        {"id": ids[1], "status": "VERIFIED"},
+        {"id": ids[2], "status": "VERIFIED"},
+        {"id": ids[3], "status": "REJECTED"},
+        {"id": ids[4], "status": "VERIFIED"},
+        {"id": ids[5], "status": "VERIFIED"},
+        {"id": ids[5], "status": "REJECTED"},  # duplicate: neither applies
+        {"id": ids[6], "status": "PENDING"},  # invalid target
+        {"id": 10 ** 9, "status": "VERIFIED"},  # not found
+    ]}, headers=faculty)
+    assert response.status_code == 200, response.text
+    assert response.json()["updated"] == 4
+    assert_counters_match()
+
+    # Decisions made in bulk can still be revised one at a time
+    verify(client, faculty, ids[1], "REJECTED")
+    verify(client, faculty, ids[6], "VERIFIED")
+    assert_counters_match()
+
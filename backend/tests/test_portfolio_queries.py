@@ -0,0 +1,92 @@
+"""Statement budgets for the portfolio endpoints.
+
+Every endpoint that renders a portfolio must issue a fixed number of SQL
+statements however many achievements the student has; a lazy load sneaking
+back in shows up here as a count that grows with the portfolio.
+"""
+import itertools
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+import database
+import main
+
+# Statements per request with a warm principal cache
+BUDGETS = {"me": 2, "profile": 5, "share": 5, "public": 2}
+
+_accounts = itertools.count()
+
+
+@pytest.fixture(scope="module")
+def client():
+    return TestClient(main.app)
+
+
+@pytest.fixture
+def statements():
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(database.engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(database.engine, "before_cursor_execute", record)
+
+
+def login(client, role, **profile):
+    email = f"{role}-{next(_accounts)}@eduzo.example.com"
+    response = client.post("/api/auth/register", json={
+        "email": email, "password": "pw123456", "full_name": "Test User", "role": role, **profile,
+    })
+    assert response.status_code == 200, response.text
+    token = client.post("/api/auth/login", data={"username": email, "password": "pw123456"}).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def seed_student(client, faculty, achievements):
+    student = login(client, "student", enrollment_no=f"ENR-{next(_accounts)}", department="CS")
+    for i in range(achievements):
+        achievement = client.post("/api/portfolio/achievements", json={"title": f"Award {i}", "description": "d"}, headers=student)
+        if i % 2 == 0:
+            client.put(f"/api/portfolio/achievements/{achievement.json()['id']}/verify?status=VERIFIED", headers=faculty)
+    return student
+
+
+def measure(client, student, statements):
+    def count(request):
+        # Warm the principal cache first (a profile update invalidates it) so
+        # only the endpoint's own queries are counted, whatever ran before
+        assert client.get("/api/portfolio/me", headers=student).status_code == 200
+        statements.clear()
+        response = request()
+        assert response.status_code == 200, response.text
+        return len(statements)
+
+    counts = {
+        "me": count(lambda: client.get("/api/portfolio/me", headers=student)),
+        "profile": count(lambda: client.put("/api/portfolio/profile", json={"bio": "Hello"}, headers=student)),
+        "share": count(lambda: client.post("/api/portfolio/share", headers=student)),
+    }
+    # Sharing again invalidates the cached public view, so this render is cold
+    share_token = client.post("/api/portfolio/share", headers=student).json()["share_token"]
+    counts["public"] = count(lambda: client.get(f"/api/portfolio/public/{share_token}"))
+    return counts
+
+
+@pytest.mark.parametrize("achievements", [1, 40])
+def test_portfolio_statement_budget(client, statements, achievements):
+    faculty = login(client, "faculty", department="CS")
+    student = seed_student(client, faculty, achievements)
+
+    assert measure(client, student, statements) == BUDGETS
+
+
+def test_statement_count_independent_of_portfolio_size(client, statements):
+    faculty = login(client, "faculty", department="CS")
+    small = measure(client, seed_student(client, faculty, 1), statements)
+    large = measure(client, seed_student(client, faculty, 60), statements)
+
+    assert small == large
@@ -17,6 +17,9 @@ const FacultyDashboard = () => {
     const [pendingAchievements, setPendingAchievements] = useState<Achievement[]>([]);
     const [analytics, setAnalytics] = useState<any>(null);
     const [loading, setLoading] = useState(true);
+    // The pending queue is paginated; the backend returns the next page's cursor in X-Next-Cursor
+    const [nextCursor, setNextCursor] = useState<string | null>(null);
+    const [loadingMore, setLoadingMore] = useState(false);
 
     const fetchData = async () => {
         try {
@@ -25,6 +28,7 @@ const FacultyDashboard = () => {
                 api.get('/api/portfolio/analytics')
             ]);
             setPendingAchievements(achievementsRes.data);
+            setNextCursor(achievementsRes.headers['x-next-cursor'] || null);
             setAnalytics(analyticsRes.data);
         } catch (error) {
             console.error("Failed to fetch data", error);
@@ -37,6 +41,20 @@ const FacultyDashboard = () => {
         fetchData();
     }, []);
 
+    const loadMore = async () => {
+        if (!nextCursor) return;
+        setLoadingMore(true);
+        try {
+            const res = await api.get('/api/portfolio/achievements/pending', { params: { cursor: nextCursor } });
+            setPendingAchievements((current) => [...current, ...res.data]);
+            setNextCursor(res.headers['x-next-cursor'] || null);
+        } catch (error) {
+            console.error("Failed to load more achievements", error);
+        } finally {
+            setLoadingMore(false);
+        }
+    };
+
     const handleVerify = async (id: number, status: 'VERIFIED' | 'REJECTED') => {
         try {
             await api.put(`/api/portfolio/achievements/${id}/verify`, { status });
@@ -97,7 +115,7 @@ const FacultyDashboard = () => {
                     <div className="px-6 py-4 border-b border-gray-200 bg-gray-50 flex justify-between items-center">
                         <h2 className="text-lg font-semibold text-gray-800">Pending Achievement Requests</h2>
                         <span className="bg-yellow-100 text-yellow-800 text-xs font-medium px-2.5 py-0.5 rounded-full">
-                            {pendingAchievements.length} Pending
+                            {analytics?.pending_count ?? pendingAchievements.length} Pending
                         </span>
                     </div>
 
@@ -138,6 +156,14 @@ const FacultyDashboard = () => {
                             ))}
                         </div>
                     )}
+
+                    {nextCursor && (
+                        <div className="px-6 py-4 border-t border-gray-200 text-center">
+                            <Button variant="outline" onClick={loadMore} disabled={loadingMore}>
+                                {loadingMore ? 'Loading...' : 'Load more'}
+                            </Button>
+                        </div>
+                    )}
                 </div>
             </main>
         </div>
@@ -1,8 +1,17 @@
+import argparse
+import glob
+import shutil
+import socket
 import subprocess
+import tempfile
 import time
 import os
 import signal
 import sys
+import urllib.parse
+import urllib.request
+
+CORES = os.cpu_count() or 1
 
 # Define services configuration
 services = [
@@ -10,7 +19,15 @@ services = [
         "name": "Backend",
         "command": ["python", "-m", "uvicorn", "main:app", "--host", "0.0.0.0", "--port", "8000", "--reload"],
         "cwd": "backend",
-        "env": {}
+        "env": {},
+        # Production mode settings
+        "app": "main:app",
+        "port": 8000,
+        "workers": CORES,
+        "health": "/health",
+        "ready": "/ready",
+        # Caches, login limits and replica stickiness must be shared by workers
+        "shared_state": True,
     },
     {
         "name": "AI Service",
@@ -19,13 +36,24 @@ services = [
         # Bat file said 'main:app', so we trust it.
         "command": ["python", "-m", "uvicorn", "main:app", "--host", "0.0.0.0", "--port", "8001", "--reload"],
         "cwd": "ai-service",
-        "env": {"MOCK_AI": "true"}
+        "env": {"MOCK_AI": "true"},
+        "app": "main:app",
+        "port": 8001,
+        # Every worker loads its own copy of the model
+        "workers": 1,
+        "health": "/health",
     },
     {
         "name": "Analytics",
         "command": ["python", "-m", "uvicorn", "main:app", "--host", "0.0.0.0", "--port", "8002", "--reload"],
         "cwd": "analytics-service",
-        "env": {}
+        "env": {},
+        "app": "main:app",
+        "port": 8002,
+        "workers": max(1, CORES // 2),
+        "health": "/health",
+        # Falls back to per-process in-memory event storage without Redis
+        "shared_state": True,
     },
     {
         "name": "Frontend",
@@ -79,7 +107,227 @@ def stop_services(signum, frame):
     print("Cleanup complete. Exiting.")
     sys.exit(0)
 
+# ---------------------------------------------------------------------------
+# Production mode: a small supervisor in the spirit of gunicorn's arbiter.
+# Each service's listening socket is bound once here and shared with N
+# uvicorn workers (--fd), so a crashed worker can be replaced without the
+# port ever going away.
+# ---------------------------------------------------------------------------
+
+STARTUP_TIMEOUT = float(os.getenv("STARTUP_TIMEOUT", "120"))
+GRACEFUL_TIMEOUT = float(os.getenv("GRACEFUL_TIMEOUT", "30"))
+RESTART_BACKOFF_BASE = 1.0
+RESTART_BACKOFF_MAX = 30.0
+# A worker that stayed up this long is considered healthy again
+RESTART_RESET_AFTER = 60.0
+
+class Worker:
+    def __init__(self, service, index):
+        self.service = service
+        self.index = index
+        self.process = None
+        self.started_at = 0.0
+        self.failures = 0
+        self.restart_at = None
+
+    def spawn(self):
+        service = self.service
+        command = [sys.executable, "-m", "uvicorn", service["app"],
+                   "--timeout-graceful-shutdown", str(int(GRACEFUL_TIMEOUT))]
+        pass_fds = ()
+        if service["socket"] is not None:
+            command += ["--fd", str(service["socket"].fileno())]
+            pass_fds = (service["socket"].fileno(),)
+        else:
+            # No fd inheritance on Windows: let uvicorn manage its own workers
+            command += ["--host", "0.0.0.0", "--port", str(service["port"]), "--workers", str(service["workers"])]
+        self.process = subprocess.Popen(command, cwd=service["cwd_path"], env=service["env_vars"], pass_fds=pass_fds)
+        self.started_at = time.monotonic()
+        self.restart_at = None
+
+    def check(self):
+        """Reap a dead worker and schedule (or perform) its restart"""
+        now = time.monotonic()
+        if self.process is not None and self.process.poll() is not None:
+            code = self.process.returncode
+            forget_worker_metrics(self.service, self.process.pid)
+            self.process = None
+            if now - self.started_at >= RESTART_RESET_AFTER:
+                self.failures = 0
+            delay = min(RESTART_BACKOFF_MAX, RESTART_BACKOFF_BASE * 2 ** self.failures)
+            self.failures += 1
+            self.restart_at = now + delay
+            print(f"[{self.service['name']}] worker {self.index} exited with {code}; restarting in {delay:.0f}s")
+        if self.process is None and self.restart_at is not None and now >= self.restart_at:
+            self.spawn()
+            print(f"[{self.service['name']}] worker {self.index} restarted (PID: {self.process.pid})")
+
+def forget_worker_metrics(service, pid):
+    """Equivalent of prometheus_client's mark_process_dead for live gauges"""
+    metrics_dir = service["env_vars"].get("PROMETHEUS_MULTIPROC_DIR")
+    if metrics_dir:
+        for path in glob.glob(os.path.join(metrics_dir, f"gauge_live*_{pid}.db")):
+            os.remove(path)
+
+def probe(port, path):
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}{path}", timeout=2) as response:
+            return response.status == 200
+    except Exception:
+        return False
+
+def redis_reachable(url):
+    try:
+        import redis
+    except ImportError:
+        redis = None
+    try:
+        if redis is not None:
+            return bool(redis.from_url(url, socket_connect_timeout=2).ping())
+        parsed = urllib.parse.urlparse(url)
+        with socket.create_connection((parsed.hostname or "localhost", parsed.port or 6379), timeout=2):
+            return True
+    except Exception:
+        return False
+
+def check_shared_state(managed, workers=None):
+    """Services keeping state in Redis only share it between workers when
+    REDIS_URL is set; otherwise each worker would hold its own caches (stale
+    public portfolios after a write) and its own login-attempt counters"""
+    problems = []
+    for service in managed:
+        count = workers or service["workers"]
+        if not service.get("shared_state") or count <= 1:
+            continue
+        url = service["env"].get("REDIS_URL") or os.environ.get("REDIS_URL")
+        if not url:
+            problems.append(f"[{service['name']}] {count} workers need REDIS_URL so they share state")
+        elif not redis_reachable(url):
+            problems.append(f"[{service['name']}] Redis at {url} is not reachable")
+    return problems
+
+def prepare_service(service, root_dir, workers=None):
+    service["cwd_path"] = os.path.join(root_dir, service["cwd"])
+    if workers:
+        service["workers"] = workers
+    env = os.environ.copy()
+    env.update(service["env"])
+    if service["workers"] > 1:
+        # Fresh per run: stale files from a previous run would be summed in
+        env["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix=f"metrics-{service['cwd']}-")
+    service["env_vars"] = env
+    service["socket"] = None
+    worker_count = service["workers"]
+    if os.name != "nt":
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind(("0.0.0.0", service["port"]))
+        sock.listen(2048)
+        service["socket"] = sock
+    else:
+        worker_count = 1
+    return [Worker(service, i) for i in range(worker_count)]
+
+def run_production(workers=None):
+    stopping = []
+
+    def request_stop(signum, frame):
+        stopping.append(signum)
+
+    signal.signal(signal.SIGINT, request_stop)
+    signal.signal(signal.SIGTERM, request_stop)
+
+    root_dir = os.getcwd()
+    # The frontend is served from its `npm run build` bundle in production
+    managed = [s for s in services if "app" in s]
+    problems = check_shared_state(managed, workers)
+    if problems:
+        print("\n".join(problems))
+        print("Set REDIS_URL to a running Redis or start with --workers 1.")
+        sys.exit(1)
+    pool = {}
+    for service in managed:
+        pool[service["name"]] = prepare_service(service, root_dir, workers)
+        service["spawned_at"] = time.monotonic()
+        # One worker first so schema creation and other boot work isn't raced
+        pool[service["name"]][0].spawn()
+        print(f"[{service['name']}] Starting {service['workers']} worker(s) on port {service['port']}...")
+
+    # Health-gated startup: a service counts as up once /health and its
+    # readiness probe answer 200 (the remaining workers are forked then),
+    # while crashed workers keep being restarted
+    startup = {}
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while len(startup) < len(managed) and time.monotonic() < deadline and not stopping:
+        for service in managed:
+            for worker in pool[service["name"]]:
+                worker.check()
+            if service["name"] in startup:
+                continue
+            if probe(service["port"], service["health"]) and probe(service["port"], service.get("ready", service["health"])):
+                startup[service["name"]] = time.monotonic() - service["spawned_at"]
+                print(f"[{service['name']}] Ready in {startup[service['name']]:.2f}s")
+                for worker in pool[service["name"]][1:]:
+                    worker.spawn()
+        time.sleep(0.2)
+
+    print("\n---------------------------------------------------")
+    for service in managed:
+        elapsed = startup.get(service["name"])
+        state = f"ready in {elapsed:.2f}s" if elapsed is not None else "NOT READY"
+        print(f"{service['name']:<12} :{service['port']}  {service['workers']} worker(s)  {state}")
+    print("---------------------------------------------------")
+
+    exit_code = 0
+    if len(startup) < len(managed) and not stopping:
+        print(f"Startup failed: not every service became ready within {STARTUP_TIMEOUT:.0f}s")
+        exit_code = 1
+    elif not stopping:
+        print("ALL SERVICES RUNNING. Send SIGTERM or press Ctrl+C to drain and stop.")
+
+    while not stopping and exit_code == 0:
+        for workers_ in pool.values():
+            for worker in workers_:
+                worker.check()
+        time.sleep(0.5)
+
+    shutdown(managed, pool)
+    sys.exit(exit_code)
+
+def shutdown(managed, pool):
+    """Graceful drain: uvicorn stops accepting on SIGTERM and finishes
+    in-flight requests; anything still alive after GRACEFUL_TIMEOUT is killed"""
+    print("\nDraining services...")
+    for service in managed:
+        if service["socket"] is not None:
+            service["socket"].close()
+    alive = [w.process for workers in pool.values() for w in workers if w.process is not None]
+    for p in alive:
+        p.send_signal(signal.SIGTERM)
+    deadline = time.monotonic() + GRACEFUL_TIMEOUT + 5
+    for p in alive:
+        try:
+            p.wait(timeout=max(0, deadline - time.monotonic()))
+        except subprocess.TimeoutExpired:
+            print(f"PID {p.pid} did not drain in time; killing")
+            p.kill()
+            p.wait()
+    for service in managed:
+        metrics_dir = service["env_vars"].get("PROMETHEUS_MULTIPROC_DIR")
+        if metrics_dir:
+            shutil.rmtree(metrics_dir, ignore_errors=True)
+    print("Cleanup complete. Exiting.")
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run all EduZo services")
+    parser.add_argument("--production", action="store_true",
+                        help="multi-worker services without --reload, health-gated startup and restarts")
+    parser.add_argument("--workers", type=int, help="workers per service (default: sized to CPU cores)")
+    args = parser.parse_args()
+
+    if args.production:
+        run_production(args.workers)
+
     # Handle Ctrl+C
     signal.signal(signal.SIGINT, stop_services)
     